@@ -11,12 +11,16 @@ import marketplace.auctions
 import marketplace.user
 import marketplace.trie
 import marketplace.auction
+import marketplace.auction_list_view
 import marketplace.systemmessages
-import marketplace.avl_tree
-from marketplace import avl_tree
 
 
 class AuctionAppInit:
+    # Wartezeit nach dem letzten Tastendruck, bevor die Vorschläge der Autovervollständigung berechnet werden
+    SUGGESTIONS_DELAY_MS = 150
+    # Anzahl der Vorschläge, die der Tooltip anzeigt
+    NUM_SUGGESTIONS = 10
+
     def __init__(self, root):
         self.root = root
         self.root.title("Online-Marktplatz für Auktionen")
@@ -41,9 +45,16 @@ class AuctionAppInit:
         self.add_items2all_items_list()
 
         self.trie = marketplace.trie.Trie()
-        self.avl_tree = avl_tree.AVLTree()
 
+        # der Tooltip mit den Vorschlägen wird nur einmal erzeugt und danach nur noch ein- und ausgeblendet
         self.tooltip = None
+        self.tooltip_listbox = None
+        self._suggestions_shown = []
+
+        # geplante Berechnung der Vorschläge (root.after) und Zähler, um veraltete Berechnungen zu erkennen
+        self._suggestions_job = None
+        self._suggestions_generation = 0
+
         self.initialize_trie()
 
         self.enable_widgets(False)  # Initially disable all widgets
@@ -109,6 +120,12 @@ class AuctionAppInit:
         self.item_listbox = tk.Listbox(self.frame_myauctions, width=110)
         self.item_listbox.grid(row=1, column=0, rowspan=7, columnspan=3, padx=5, pady=5, sticky="nsew")
         self.item_listbox.bind('<<ListboxSelect>>', self.on_item_listbox_select)
+        self.item_scrollbar = ttk.Scrollbar(self.frame_myauctions, orient=tk.VERTICAL)
+        self.item_scrollbar.grid(row=1, column=3, rowspan=7, pady=5, sticky="ns")
+        # auch verkaufte und ersteigerte Auktionen werden hier angezeigt, deshalb hide_expired=False
+        self.my_items_view = marketplace.auction_list_view.AuctionListView(self.item_listbox, self._auctions,
+                                                                           scrollbar=self.item_scrollbar,
+                                                                           hide_expired=False)
 
         self.add_item_btn = tk.Button(self.frame_myauctions, text="Auktion hinzufügen", command=self.add_item_widget)
         self.add_item_btn.grid(row=1, column=4, padx=5, pady=5, sticky="ew")
@@ -195,15 +212,16 @@ class AuctionAppInit:
 
         tk.Label(self.frame_search_bid, text="Alle Auktionen", justify='left').grid(row=0, column=0, columnspan=12,
                                                                                     padx=5, pady=5, sticky="ew")
-        self.all_items_listbox = tk.Listbox(self.frame, width=140, height=30,
-                                            yscrollcommand=self.scrollbar.set)
+        self.all_items_listbox = tk.Listbox(self.frame, width=140, height=30)
         # self.all_items_listbox.grid(row=6, column=6, rowspan=13, columnspan=6, padx=5, pady=5)
         # Bind the <<ListboxSelect>> event to the on_listbox_select function
         self.all_items_listbox.bind('<<ListboxSelect>>', self.on_listbox_select)
-        # Link it to the listbox.
-        self.scrollbar.config(command=self.all_items_listbox.yview)
         self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.all_items_listbox.pack()
+        # merkt sich, welche Auktion in welcher Zeile steht, damit nur geänderte Zeilen neu geschrieben werden. die
+        # Listbox enthält nur die sichtbaren Zeilen (und ein paar mehr), die Scrollbar wird von der View gesteuert
+        self.all_items_view = marketplace.auction_list_view.AuctionListView(self.all_items_listbox, self._auctions,
+                                                                            scrollbar=self.scrollbar)
 
     def create_frame_auction_detail(self, listbox="all_items"):
         if listbox == "all_items":
@@ -307,7 +325,6 @@ class AuctionAppInit:
     # *** FUNCTION HANDLES invoked by tk widget items ***
 
     def add_myitems2items_list(self):
-        self.item_listbox.delete(0, tk.END)
         value = self.view_option.get()
 
         user_id = self._current_user.id()
@@ -327,8 +344,8 @@ class AuctionAppInit:
         else:
             auctions = []
 
-        for auction_id in auctions:
-            self.item_listbox.insert(tk.END, self._auctions[auction_id].pretty_print(False, user_id_pass))
+        # nur die sichtbaren Zeilen werden formatiert; ist die Liste unverändert, werden nur geänderte Zeilen ersetzt
+        self.my_items_view.show(auctions, render=lambda auction: auction.pretty_print(False, user_id_pass))
 
     def on_listbox_select(self, event):
         self.create_frame_auction_detail(listbox="all_items")
@@ -434,16 +451,20 @@ class AuctionAppInit:
     def search_items(self):
         search_term = self.search_entry.get()
 
-        # wieder alle Auktionen anzeigen
-        self.add_items2all_items_list()
-        
         if search_term == "":
+            # wieder alle Auktionen anzeigen
+            self.add_items2all_items_list()
             return
 
-        results = [item for item in self.all_items_listbox.get(0, tk.END) if search_term.lower() in item.lower()]
-        self.all_items_listbox.delete(0, tk.END)
-        for item in results:
-            self.all_items_listbox.insert(tk.END, item)
+        # Auktionen, in deren Name oder Beschreibung alle Suchwörter vorkommen. gibt es keine, reicht ein Suchwort
+        auction_ids = self._auctions.search_auctions(search_term)
+        if not auction_ids:
+            auction_ids = self._auctions.search_auctions(search_term, match_all=False)
+
+        # bei späteren Aktualisierungen bleiben nur die gefundenen Auktionen in der Liste
+        auction_ids_found = set(auction_ids)
+        self.all_items_view.show([auction_id for auction_id in auction_ids if not self._auctions[auction_id].expired()],
+                                 include=lambda auction_id: auction_id in auction_ids_found)
         self.hide_tooltip()
 
     def add_item_widget(self):
@@ -476,11 +497,9 @@ class AuctionAppInit:
             success = self._auctions.delete(auction_id)
 
             if success:
-                self.item_listbox.delete(selected)
+                self.my_items_view.remove(auction_id)
 
-                index = self.search_auction_id_in_all_items_listbox(auction_id)
-                # index = self.all_items_listbox.get(0, tk.END).index(auction_desc)
-                self.all_items_listbox.delete(index)
+                self.all_items_view.remove(auction_id)
 
                 self.system_messages.push("Auktion erfolgreich gelöscht.")
             else:
@@ -511,23 +530,24 @@ class AuctionAppInit:
                 messagebox.showerror("Fehler",
                                      "Nicht genügend Guthaben oder Ihr Gebot ist unter dem Mindestgebot")
             else:
-                self.update_listbox_item(selected, auction_id)
+                self.update_listbox_item(auction_id)
                 self.system_messages.push("Gebot erfolgreich abgegeben für {0}.".format(
                     self._auctions[auction_id].get_item_name()))
         else:
             print('place_bid fails: ', bid_amount, selected, is_all_items_listbox, value)
 # VERÄNDERT
     def show_suggestions(self, event):
-        search_text = self.search_entry.get()
-        if search_text:
-            #suggestions = self.trie.search(search_text)
-            avl_suggestions = self.avl_tree.find_most_likely_words(search_text)
-            self.show_tooltip(avl_suggestions)
-        else:
-            self.hide_tooltip()
+        # Vorschläge erst berechnen, wenn der Nutzer SUGGESTIONS_DELAY_MS lang nichts getippt hat. eine noch
+        # geplante Berechnung für eine ältere Eingabe wird abgebrochen
+        self._cancel_suggestions()
+        self._suggestions_job = self.root.after(self.SUGGESTIONS_DELAY_MS, self._update_suggestions,
+                                                self._suggestions_generation)
 
     def on_select(self, event):
-        selected = event.widget.get(event.widget.curselection())
+        selection = event.widget.curselection()
+        if not selection:   # <<ListboxSelect>> kommt auch, wenn die Auswahl beim Aktualisieren verloren geht
+            return
+        selected = event.widget.get(selection)
         self.search_entry.delete(0, tk.END)
         self.search_entry.insert(0, selected)
         self.hide_tooltip()
@@ -577,54 +597,23 @@ class AuctionAppInit:
 
         self.mutual_friends_listbox.insert(0, *mutual_friends)
 
-    def update_listbox_item(self, selected_index, auction_id):
-        # Get the selected index
-        if selected_index:
-            # Get the new value from the user
-            new_value = self._auctions[auction_id].pretty_print()
-            if new_value:
-                # Delete the old entry
-                self.all_items_listbox.delete(selected_index)
-                # Insert the new entry at the same position
-                self.all_items_listbox.insert(selected_index, new_value)
+    def update_listbox_item(self, auction_id):
+        # nur die Zeile der Auktion wird neu geschrieben (falls sie in der Liste steht), die Auswahl bleibt erhalten
+        self.all_items_view.update([auction_id])
 
     def add_items2all_items_list(self):
-        # speichern welches Element in der Liste ausgewählt war, damit es auch am Ende der
-        # Funktion wieder ausgewählt werden kann
-        selected_index = self.all_items_listbox.curselection()
-        if selected_index:
-            auction_desc = self.all_items_listbox.get(selected_index)
-
-            auction_id_before = marketplace.auction.Auction.get_id_from_pretty_print(auction_desc)
-        else:
-            auction_id_before = None
+        # alle Auktionen, die nicht ausgelaufen sind, in der Liste anzeigen. ein vorher ausgewähltes Element bleibt
+        # ausgewählt, wenn es noch in der Liste existiert
+        self.all_items_view.show(auction_id for auction_id, auction in self._auctions.items()
+                                 if not auction.expired())
 
-        # alle Elemente in Liste löschen und Auktionen die nicht ausgelaufen sind, wieder
-        # in liste einfügen
-        self.all_items_listbox.delete(0, tk.END)
-
-        for auction_id, auction in self._auctions.items():
-            if not auction.expired():
-                self.all_items_listbox.insert(tk.END, auction.pretty_print())
-
-        # wenn vor dem Löschvorgang ein Element in der Liste ausgewählt war, dieses wieder auswählen,
-        # wenn Element noch in Liste existiert
-        if auction_id_before:
-            self.search_auction_id_in_all_items_listbox(auction_id_before)
+    def update_all_items_list(self):
+        # nur die Zeilen der Auktionen aktualisieren, die seit der letzten Aktualisierung neu sind, auf die geboten
+        # wurde oder die abgelaufen sind
+        self.all_items_view.update(self._auctions.pop_dirty_auctions())
 
     def search_auction_id_in_all_items_listbox(self, auction_id_searching):
-        item = None
-
-        for item in range(self.all_items_listbox.size()):
-            auction_desc = self.all_items_listbox.get(item)
-
-            auction_id = marketplace.auction.Auction.get_id_from_pretty_print(auction_desc)
-
-            if auction_id == auction_id_searching:
-                self.all_items_listbox.select_set(item)
-                break
-
-        return item
+        return self.all_items_view.select(auction_id_searching)
 
     def add_new_auction(self, widget):
         item_name = self.new_article_name.get()
@@ -636,9 +625,12 @@ class AuctionAppInit:
         # Aufrufen der Methode add_new_auction der Auktionsklasse
         auction = self._auctions.add_new_auction(user_id, item_name, description, value_min)
 
+        # der Produktname kommt jetzt einmal häufiger vor, damit ändern sich evtl. die Vorschläge der Suche
+        self.trie.insert(item_name)
+
         if self.view_option.get() == 'offered':
-            self.item_listbox.insert(tk.END, auction.pretty_print(False))
-        self.all_items_listbox.insert(tk.END, auction.pretty_print())
+            self.add_myitems2items_list()
+        self.all_items_view.update([auction.id()])
 
         self.system_messages.push("Neue Auktion erfolgreich erstellt.")
 
@@ -661,69 +653,99 @@ class AuctionAppInit:
 
         # Zählen Sie die Häufigkeit der kombinierten Einträge, um doppelte Einträge zu verwalten
         counter = Counter(combined_entries)
-        tuple_list = list(counter.items())
 
-        # Fügen Sie jeden Eintrag sowohl in den Trie als auch in den AVL-Baum ein
-        for entry, count in tuple_list:
-            self.trie.insert(entry)  # Fügt den Eintrag (Produktname oder Nutzer-ID) in das Trie ein
-            self.avl_tree.insert(entry, count)  # Fügt den Eintrag in den AVL-Baum ein mit Häufigkeit
+        # Fügen Sie jeden Eintrag in den Trie ein
+        for entry, count in counter.items():
+            self.trie.insert(entry, count)  # Fügt den Eintrag (Produktname oder Nutzer-ID) mit Häufigkeit in das Trie ein
 
     def show_tooltip(self, suggestions):
-        if self.tooltip:
-            self.tooltip.destroy()
-
-        # Calculate the height and width of the Listbox based on content
-        max_height = 10  # Maximum number of items to show before adding a scrollbar
-        num_items = min(len(suggestions), max_height)  # Limit the number of visible items
+        """Shows the suggestions in the tooltip below the search entry. The tooltip and its Listbox are created
+        only once; afterwards only the rows that differ from the suggestions shown before are replaced."""
+        # Limit the number of visible items
+        suggestions = suggestions[:self.NUM_SUGGESTIONS]
+        if not suggestions:
+            self.hide_tooltip()
+            return
 
-        if num_items > 0:
-            # Create a new tooltip window
+        if self.tooltip is None:
+            # Create the tooltip window and the Listbox for suggestions
             self.tooltip = tk.Toplevel(self.root)
             self.tooltip.wm_overrideredirect(True)  # Remove window decorations
-
-            # Calculate the position to display the tooltip
-            x, y, _, _ = self.search_entry.bbox("insert")
-            x += self.search_entry.winfo_rootx()
-            y += self.search_entry.winfo_rooty() + 25
-            self.tooltip.geometry(f"+{x}+{y}")  # Set initial position
-
-            # Create the Listbox for suggestions
-            listbox = tk.Listbox(self.tooltip)
-            listbox.pack()
-
-            # Add suggestions to the Listbox
-            for suggestion in suggestions:
+            self.tooltip_listbox = tk.Listbox(self.tooltip, exportselection=False)
+            self.tooltip_listbox.pack()
+            self.tooltip_listbox.bind("<<ListboxSelect>>", self.on_select)
+
+        # Replace only the rows that changed and delete the rows that are not needed anymore
+        listbox = self.tooltip_listbox
+        for index, suggestion in enumerate(suggestions):
+            if index >= len(self._suggestions_shown):
                 listbox.insert(tk.END, suggestion)
+            elif self._suggestions_shown[index] != suggestion:
+                listbox.delete(index)
+                listbox.insert(index, suggestion)
+        if len(self._suggestions_shown) > len(suggestions):
+            listbox.delete(len(suggestions), tk.END)
 
-            listbox.bind("<<ListboxSelect>>", self.on_select)
-
-            # Determine the maximum width needed for the suggestions
-            max_width = max(len(s) for s in suggestions) + 2  # Add padding to width
+        # Set height and width of the Listbox to accommodate the suggestions. The tooltip has no fixed size,
+        # so it shrinks or grows with the Listbox
+        max_width = max(len(s) for s in suggestions) + 2  # Add padding to width
+        listbox.config(height=len(suggestions), width=max_width)
 
-            # Set height and width of the Listbox to accommodate the suggestions
-            listbox.config(height=num_items, width=max_width)
-            listbox.update_idletasks()  # Update Listbox geometry calculations
-
-            # Correctly calculate width and height of the Listbox after updates
-            width = listbox.winfo_reqwidth()  # Use winfo_reqwidth() to get requested width
-            height = listbox.winfo_reqheight()  # Use winfo_reqheight() to get requested height
-
-            # Update tooltip size based on Listbox size
-            self.tooltip.geometry(f"{width}x{height}+{x}+{y}")
+        self._suggestions_shown = suggestions
+        self.update_tooltip_position(None)
+        self.tooltip.deiconify()
 
     def hide_tooltip(self):
+        # eine noch geplante Berechnung würde den Tooltip sonst wieder anzeigen
+        self._cancel_suggestions()
         if self.tooltip:
-            self.tooltip.destroy()
-            self.tooltip = None
+            self.tooltip.withdraw()
+            self.tooltip_listbox.delete(0, tk.END)
+            self._suggestions_shown = []
 
     def update_tooltip_position(self, event):
         """Update tooltip position when the window is moved or resized."""
-        if self.tooltip:
+        if self._suggestions_shown:
             x, y, _, _ = self.search_entry.bbox("insert")
             x += self.search_entry.winfo_rootx()
             y += self.search_entry.winfo_rooty() + 25
             self.tooltip.geometry(f"+{x}+{y}")
 
+    def _update_suggestions(self, generation):
+        """Computes and shows the suggestions for the current content of the search entry. Is called by root.after()
+        from show_suggestions(); a call that was planned before a newer keystroke is ignored."""
+        if generation != self._suggestions_generation:
+            return
+        self._suggestions_job = None
+
+        search_text = self.search_entry.get()
+        if search_text:
+            self.show_tooltip(self._find_suggestions(search_text))
+        else:
+            self.hide_tooltip()
+
+    def _find_suggestions(self, search_text):
+        # der Tooltip zeigt höchstens 10 Vorschläge, die der Trie in jedem Knoten schon sortiert gespeichert hat
+        suggestions = self.trie.search(search_text, self.NUM_SUGGESTIONS)
+
+        # zu wenige Treffer, evtl. hat sich der Nutzer vertippt: ähnliche Wörter ergänzen (bei längeren
+        # Eingaben werden 2 Tippfehler toleriert, sonst 1)
+        if len(suggestions) < self.NUM_SUGGESTIONS:
+            max_distance = 2 if len(search_text) >= 6 else 1
+            for suggestion in self.trie.fuzzy_search(search_text, max_distance, self.NUM_SUGGESTIONS):
+                if len(suggestions) >= self.NUM_SUGGESTIONS:
+                    break
+                if suggestion not in suggestions:
+                    suggestions.append(suggestion)
+        return suggestions
+
+    def _cancel_suggestions(self):
+        # jede geplante Berechnung gehört zu einer Generation, nach dem Hochzählen ist sie veraltet
+        self._suggestions_generation += 1
+        if self._suggestions_job is not None:
+            self.root.after_cancel(self._suggestions_job)
+            self._suggestions_job = None
+
     # *** PRIVATE STATIC METHODS ***
 
     def _on_closing(self):
@@ -0,0 +1,52 @@
+# Benchmark für marketplace.avl_tree.AVLTree: misst den Durchsatz von insert() und find() für n Schlüssel.
+# Die Schlüssel sind Produktnamen aus auctions.csv, die durch eine laufende Nummer eindeutig gemacht werden.
+#
+# Aufruf aus dem Hauptverzeichnis des Projekts:
+#     python -m benchmarks.avl_tree_benchmark 100000 1000000
+
+import csv
+import random
+import sys
+import time
+
+from marketplace.avl_tree import AVLTree
+
+
+def read_product_names(csvfile="auctions.csv"):
+    with open(csvfile, newline='', encoding='utf-8-sig') as file:
+        csvreader = csv.reader(file)
+        next(csvreader)
+        return sorted({row[0] for row in csvreader})
+
+
+def create_keys(num_keys, product_names):
+    keys = [f"{product_names[i % len(product_names)]} {i}" for i in range(num_keys)]
+    random.shuffle(keys)
+    return keys
+
+
+def benchmark(num_keys, product_names):
+    keys = create_keys(num_keys, product_names)
+
+    tree = AVLTree()
+    start = time.perf_counter()
+    for key in keys:
+        tree.insert(key, 1)
+    time_insert = time.perf_counter() - start
+
+    keys_lower = [key.lower() for key in keys]
+    random.shuffle(keys_lower)
+    start = time.perf_counter()
+    for key in keys_lower:
+        tree.find(key)
+    time_find = time.perf_counter() - start
+
+    print(f"n = {num_keys:>8}: insert {num_keys / time_insert:>10.0f} keys/s, "
+          f"find {num_keys / time_find:>10.0f} keys/s, height {tree.height()}")
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    names = read_product_names()
+    for n in (int(arg) for arg in sys.argv[1:] or ["100000"]):
+        benchmark(n, names)
@@ -0,0 +1,81 @@
+# Benchmark für marketplace.trie.Trie und marketplace.radix_trie.RadixTrie: misst Speicherbedarf, Anzahl Knoten
+# sowie die Laufzeit von insert() und search() auf dem Vokabular der Autovervollständigung (Produktnamen aus
+# auctions.csv und User-IDs aus user.csv). Das Vokabular wird vervielfacht, indem jedes Wort mit den laufenden
+# Nummern 0 bis scale - 1 versehen wird.
+#
+# Aufruf aus dem Hauptverzeichnis des Projekts:
+#     python -m benchmarks.trie_benchmark 100
+
+import csv
+import random
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+from marketplace.radix_trie import RadixTrie
+from marketplace.trie import Trie
+
+
+def read_vocabulary(auctions_csvfile="auctions.csv", users_csvfile="user.csv"):
+    with open(auctions_csvfile, newline='', encoding='utf-8-sig') as file:
+        csvreader = csv.reader(file)
+        next(csvreader)
+        words = [row[0] for row in csvreader]
+    with open(users_csvfile, newline='', encoding='utf-8-sig') as file:
+        csvreader = csv.reader(file)
+        next(csvreader)
+        words += [row[0] for row in csvreader]
+    return Counter(words)
+
+
+def create_words(scale, vocabulary):
+    words = [(f"{word} {i}", count) for word, count in vocabulary.items() for i in range(scale)]
+    random.shuffle(words)
+    return words
+
+
+def count_nodes(trie):
+    num_nodes = 0
+    stack = [trie._root]
+    while stack:
+        node = stack.pop()
+        num_nodes += 1
+        stack.extend(node.children.values())
+    return num_nodes
+
+
+def benchmark(trie_class, words, prefixes):
+    tracemalloc.start()
+    start = time.perf_counter()
+    trie = trie_class()
+    for word, count in words:
+        trie.insert(word, count)
+    time_insert = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for prefix in prefixes:
+        trie.search(prefix, 10)
+    time_search = time.perf_counter() - start
+
+    num_nodes = trie.num_nodes() if isinstance(trie, RadixTrie) else count_nodes(trie)
+
+    print(f"{trie_class.__name__:>10}: {num_nodes:>9} Knoten, {memory / 2 ** 20:>8.1f} MiB, "
+          f"insert {len(words) / time_insert:>8.0f} Wörter/s, "
+          f"search {time_search / len(prefixes) * 1e6:>6.1f} µs/Präfix")
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    vocabulary = read_vocabulary()
+    for scale in (int(arg) for arg in sys.argv[1:] or ["100"]):
+        words = create_words(scale, vocabulary)
+
+        # Präfixe, wie sie beim Tippen entstehen: die ersten 1 bis 6 Zeichen zufälliger Wörter
+        prefixes = [word[:random.randint(1, 6)] for word, _ in random.choices(words, k=10000)]
+
+        print(f"scale = {scale}: {len(words)} Wörter")
+        for trie_class in (Trie, RadixTrie):
+            benchmark(trie_class, words, prefixes)
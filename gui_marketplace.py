@@ -16,6 +16,8 @@ class AuctionApp(AuctionAppInit):
 
         self.start_update_timer()
 
+        self.start_expiry_timer()
+
     # *** Alle 30 Sekunden wird überprüft welche Auktionen abgelaufen sind und die Listen werden aktualisiert ***
 
     def update_listboxes(self):
@@ -38,9 +40,8 @@ class AuctionApp(AuctionAppInit):
                     top_user[0], top_user[1])
                 )
 
-        # Aktualisieren Sie alle Listboxen hier
-        self.add_items2all_items_list()
-        self.search_items()
+        # Aktualisieren Sie alle Listboxen hier. in der Liste aller Auktionen werden nur geänderte Zeilen ersetzt
+        self.update_all_items_list()
 
         if self._current_user:
             self.update_lists()
@@ -55,16 +56,26 @@ class AuctionApp(AuctionAppInit):
         # Starte den Timer zur Aktualisierung der Listboxen
         self.update_listboxes()
 
+    # *** Jede Sekunde werden die Auktionen abgerechnet, die gerade abgelaufen sind ***
+
+    def check_auctions_expiry(self):
+        self._check_auctions_expiry()
+
+        self.root.after(1000, self.check_auctions_expiry)
+
+    def start_expiry_timer(self):
+        self.root.after(1000, self.check_auctions_expiry)
+
     # *** PRIVATE METHODS ***
 
     def _check_auctions_expiry(self):
-        for auction_id, auction in self._auctions.items():
-            # gehe alle Auktionen durch, die abgelaufen sind, aber noch nicht als verkauft gelten. das sind Auktionen,
-            # bei denen der neue Käufer noch nicht eingetragen ist. der Käufer wird in handle_expired_auction() gesetzt.
-            # da wir über jede Auktion nur einmal informieren wollen, ist die Abfrage auction.sold wichtig
-            if auction.expired() and not auction.sold():
-                success = self._auctions.handle_expired_auction(auction_id)
+        # handle_expired_auctions() liefert nur die Auktionen, die seit dem letzten Aufruf abgelaufen sind, aber noch
+        # nicht als verkauft galten. der Käufer wird dort über handle_expired_auction() gesetzt. damit wird über jede
+        # Auktion nur einmal informiert
+        for auction_id, success in self._auctions.handle_expired_auctions():
+            auction = self._auctions[auction_id]
 
+            if self._current_user:
                 if auction.seller_id() == self._current_user.id():
                     if success:
                         self.system_messages.push(
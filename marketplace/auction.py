@@ -5,7 +5,7 @@
 import heapq
 import marketplace.user
 import marketplace.item
-import marketplace.stack
+import marketplace.bid_log
 import random
 from datetime import datetime, timedelta
 
@@ -23,10 +23,20 @@ class Auction:
         _auction_ends ():
         _recommended2users (set): set of user id's that this auction is recommended to
         _users_bidding (heap): min heap of users bidding in this auction. user with the highest bid is at the root of
-        the heap (sorted by negative amount that was bid)
-        _bids_ordered (stack): same as _users_bidding but sorted chronologically
+        the heap (sorted by negative amount that was bid). entries of bids that were raised later on are stale: they
+        stay in the heap (lazy deletion) until they reach the root or the heap is compacted
+        _stale_bids (int): number of stale entries in _users_bidding
+        _bids_ordered (marketplace.bid_log.BidLog): all bids on this auction sorted chronologically
+        _bids_by_user (dict): current bid of every user bidding in this auction (key = user_id, value = amount)
+        _version (int): is increased whenever a bid is placed, the purchaser is set or the users the auction is
+        recommended to change
+        _pretty_print_cache (dict): result of pretty_print() for each variant (key = (with_sold_by, user_id), value =
+        (version, date, text)). only valid while version and the current date have not changed
     """
 
+    # Anteil veralteter Einträge in _users_bidding, ab dem der Heap neu aufgebaut wird
+    STALE_BIDS_RATIO = 0.5
+
     # *** CONSTRUCTORS ***
     def __init__(self, auction_id: str, user_id: str, item: marketplace.item.Item) -> None:
         """
@@ -52,10 +62,20 @@ class Auction:
 
         # use a heap to add a new customer with its bid (heapg implements a min heap)
         self._users_bidding = []
+        self._stale_bids = 0
 
         # bids of all users on this auction in the order in which they were done. the last bid
-        # is on top of the stack
-        self._bids_ordered = marketplace.stack.Stack()
+        # is at the end of the log
+        self._bids_ordered = marketplace.bid_log.BidLog()
+
+        # aktuelles Gebot jedes Bieters (key = user_id, value = Betrag), damit get_bid_of_user() und
+        # is_user_bidding() nicht den ganzen Heap durchsuchen müssen
+        self._bids_by_user = {}
+
+        # Version der Auktion und zuletzt formatierte Texte, damit pretty_print() unveränderte Auktionen nicht neu
+        # formatieren muss
+        self._version = 0
+        self._pretty_print_cache = {}
 
     # *** PUBLIC SET methods ***
 
@@ -66,13 +86,16 @@ class Auction:
         """
         if self.expired():
             self._purchaser_id = self.get_highest_bidder()
+            self._version += 1
         else:
             raise ValueError("set_purchaser_id() darf noch nicht aufgerufen werden, da Auktion noch nicht zu Ende ist!")
 
         return self._purchaser_id
 
     def recommend2user(self, user_id):
-        self._recommended2users.add(user_id)
+        if user_id not in self._recommended2users:
+            self._recommended2users.add(user_id)
+            self._version += 1
 
     # *** PUBLIC methods ***
 
@@ -97,8 +120,7 @@ class Auction:
 
         # check whether user already bid before. If yes then check if new bid is higher than previous one.
         # if higher, then decrease balance only by the difference between both bids
-        # muss dann auch in _bids_ordered den entsprechenden eintrag löschen und in _users_bidding auch oder dort den
-        # betrag und den heap aktualisieren
+        # das alte Gebot wird in _bids_ordered und _users_bidding nicht gelöscht, sondern nur als überholt markiert
 
         old_bid = self.get_bid_of_user(user_id)
 
@@ -109,16 +131,17 @@ class Auction:
                 # Porto wurde schon im ersten Gebot abgezogen, deshalb muss es nicht nochmal abgezogen werden
                 portofee = 0
 
-                for item in self._bids_ordered:
-                    if item[0] == user_id:
-                        self._bids_ordered.remove(item)
-
+                # das alte Gebot bleibt als veralteter Eintrag im Heap (lazy deletion)
+                self._stale_bids += 1
             else:
                 old_bid = 0     # setze old_bid von None auf 0, um unten damit rechnen zu können
 
             heapq.heappush(self._users_bidding, (-bid_amount, user_id))
+            self._bids_by_user[user_id] = bid_amount
+            self._remove_stale_bids()
 
-            self._bids_ordered.push((user_id, bid_amount))
+            self._bids_ordered.push(user_id, bid_amount)
+            self._version += 1
 
             user.decrease_balance(bid_amount + portofee - old_bid)
 
@@ -165,21 +188,24 @@ class Auction:
         return datetime.now() >= self._auction_ends
 
     def pretty_print(self, with_sold_by=True, user_id=None):
-        if with_sold_by:
-            return "ID: {0} Name: {1} Mindestgebot: {2} € \tHöchstes Gebot: {3} € \tAuktionsende: {4} \tVerkäufer: {5}".format(
-                self._id.ljust(15), self._item.name().ljust(30), self._item.value_min(),
-                self.get_highest_bid(),
-                marketplace.auction.Auction.format_datetime(self._auction_ends), self._seller_id.ljust(10))
-        elif user_id is not None:
-            return "ID: {0} Name: {1} Mindestgebot: {2} € \tHöchstes Gebot: {3} € \tIhr Gebot: {4} € \tAuktionsende: {5}".format(
-                self._id.ljust(15), self._item.name().ljust(30), self._item.value_min(),
-                self.get_highest_bid(), self.get_bid_of_user(user_id),
-                marketplace.auction.Auction.format_datetime(self._auction_ends))
-        else:
-            return "ID: {0} Name: {1} Mindestgebot: {2} € \tHöchstes Gebot: {3} € \tAuktionsende: {4}".format(
-                self._id.ljust(15), self._item.name().ljust(30), self._item.value_min(),
-                self.get_highest_bid(),
-                marketplace.auction.Auction.format_datetime(self._auction_ends))
+        """
+        Returns the auction as one line of text. The text only changes if the auction changes (see _version) or
+        the date changes (format_datetime() returns "heute", "morgen" etc.), so it is formatted only once for each
+        version, variant and day.
+
+        :param with_sold_by: True, if the seller should be shown
+        :param user_id: if with_sold_by is False and user_id is given, the bid of this user is shown
+        :return: text of the auction
+        """
+        key = (with_sold_by, user_id)
+        today = datetime.now().date()
+        cached = self._pretty_print_cache.get(key)
+        if cached is not None and cached[0] == self._version and cached[1] == today:
+            return cached[2]
+
+        text = self._format_pretty_print(with_sold_by, user_id)
+        self._pretty_print_cache[key] = (self._version, today, text)
+        return text
 
     def get_highest_bid(self):
         """
@@ -212,10 +238,10 @@ class Auction:
         return (self._auction_ends - datetime.now()).total_seconds()
 
     def is_user_bidding(self, user_id):
-        return any(id_bidder == user_id for _, id_bidder in self._users_bidding)
+        return user_id in self._bids_by_user
 
     def is_any_bidder(self):
-        return bool(self._users_bidding)
+        return bool(self._bids_by_user)
 
     def get_bid_of_user(self, user_id):
         """
@@ -223,22 +249,30 @@ class Auction:
         :param user_id: user ID of some user
         :return: value that given user has bid in this auction. if user_id has bid nothing, then None is returned
         """
-        # minuszeichen wegen min-heap
-        return next((-value for value, id_bidder in self._users_bidding if id_bidder == user_id), None)
+        return self._bids_by_user.get(user_id)
 
     def is_recommended2user(self, user_id):
         if self.is_user_bidding(user_id) and user_id in self._recommended2users:
             self._recommended2users.remove(user_id)
+            self._version += 1
         # auction soll nur empfohlen werden, wenn user_id nicht schon auf Auktion bietet
         return user_id in self._recommended2users  # and not self.is_user_bidding(user_id)
 
     def get_last_bid(self):
         # Diese Methode gibt das zuletzt abgegebene Gebot auf der Auktion zurück.
-        # Die Methode ruft die 'peek'-Methode des Stacks _bids_ordered auf, um das oberste Element des Stacks zu erhalten.
+        # Die Methode ruft die 'peek'-Methode des BidLog _bids_ordered auf, um das letzte Element des Logs zu erhalten.
 
         return self._bids_ordered.peek()
-        # 'peek' ermöglicht es, das oberste Element zu betrachten, ohne es zu entfernen.
-        # Dies bewahrt die Struktur des Stacks und stellt sicher, dass die Reihenfolge der Gebote nicht verändert wird.
+        # 'peek' ermöglicht es, das letzte Element zu betrachten, ohne es zu entfernen.
+        # Dies bewahrt die Struktur des Logs und stellt sicher, dass die Reihenfolge der Gebote nicht verändert wird.
+
+    def get_bid_history(self):
+        """
+
+        :return: generator over all bids (seq, user_id, amount) on this auction in chronological order, including
+        bids that were raised later on
+        """
+        return self._bids_ordered.history()
 
     # *** PUBLIC STATIC methods ***
 
@@ -264,6 +298,46 @@ class Auction:
 
     # *** PRIVATE methods ***
 
+    def _format_pretty_print(self, with_sold_by, user_id):
+        if with_sold_by:
+            return "ID: {0} Name: {1} Mindestgebot: {2} € \tHöchstes Gebot: {3} € \tAuktionsende: {4} \tVerkäufer: {5}".format(
+                self._id.ljust(15), self._item.name().ljust(30), self._item.value_min(),
+                self.get_highest_bid(),
+                marketplace.auction.Auction.format_datetime(self._auction_ends), self._seller_id.ljust(10))
+        elif user_id is not None:
+            return "ID: {0} Name: {1} Mindestgebot: {2} € \tHöchstes Gebot: {3} € \tIhr Gebot: {4} € \tAuktionsende: {5}".format(
+                self._id.ljust(15), self._item.name().ljust(30), self._item.value_min(),
+                self.get_highest_bid(), self.get_bid_of_user(user_id),
+                marketplace.auction.Auction.format_datetime(self._auction_ends))
+        else:
+            return "ID: {0} Name: {1} Mindestgebot: {2} € \tHöchstes Gebot: {3} € \tAuktionsende: {4}".format(
+                self._id.ljust(15), self._item.name().ljust(30), self._item.value_min(),
+                self.get_highest_bid(),
+                marketplace.auction.Auction.format_datetime(self._auction_ends))
+
+    def _is_stale_bid(self, entry):
+        """
+
+        :param entry: tuple (-amount, user_id) from _users_bidding
+        :return: True, if user has raised this bid since, so the entry is no longer valid
+        """
+        return self._bids_by_user.get(entry[1]) != -entry[0]
+
+    def _remove_stale_bids(self):
+        """
+        Removes stale entries from the root of _users_bidding, so that the root is always the current highest bid.
+        If more than STALE_BIDS_RATIO of the heap is stale, the heap is rebuilt from _bids_by_user.
+        """
+        if self._stale_bids > self.STALE_BIDS_RATIO * len(self._users_bidding):
+            self._users_bidding = self.users_bidding()
+            heapq.heapify(self._users_bidding)
+            self._stale_bids = 0
+            return
+
+        while self._users_bidding and self._is_stale_bid(self._users_bidding[0]):
+            heapq.heappop(self._users_bidding)
+            self._stale_bids -= 1
+
     # *** PUBLIC methods to return class properties ***
 
     def id(self):
@@ -282,12 +356,22 @@ class Auction:
         return self._item
 
     def users_bidding(self):
-        return self._users_bidding
+        """
+
+        :return: list of tuples (-amount, user_id) with the current bid of every user bidding in this auction
+        """
+        return [(-amount, user_id) for user_id, amount in self._bids_by_user.items()]
+
+    def bids_ordered(self):
+        return self._bids_ordered
 
     def recommended2users(self):
         return self._recommended2users
 
     def bid_count(self):
-        return len(self._users_bidding)
+        return len(self._bids_by_user)
+
+    def version(self):
+        return self._version
 
     # *** PRIVATE variables ***
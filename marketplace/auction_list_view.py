@@ -0,0 +1,297 @@
+# Definiert die Klasse AuctionListView.
+# Eine AuctionListView verwaltet den Inhalt einer Listbox, in der Auktionen mit pretty_print() angezeigt werden. Sie
+# merkt sich, in welcher Zeile welche Auktion steht. Die Listbox enthält aber nicht alle Zeilen, sondern nur ein
+# Fenster aus den sichtbaren Zeilen und OVERSCAN Zeilen darüber und darunter (virtualisierte Liste). Nur für diese
+# Zeilen wird pretty_print() aufgerufen. Wird aus dem Fenster heraus gescrollt, wird das Fenster neu gefüllt. Die
+# Scrollbar wird deshalb nicht von der Listbox, sondern von der AuctionListView gesteuert und zeigt die Position im
+# Fenster bezogen auf alle Zeilen.
+# Bei einer Aktualisierung müssen nur die Zeilen der Auktionen ersetzt werden, die sich geändert haben
+# (s. Auctions.pop_dirty_auctions()), statt die ganze Listbox zu leeren und neu zu füllen.
+# Die Listbox muss nur die Methoden insert, delete, curselection, selection_clear, selection_set, yview, config und
+# bind einer tkinter.Listbox anbieten.
+
+class AuctionListView:
+    """
+    View model of a virtualized listbox showing auctions
+
+    Attributes:
+        _listbox (tkinter.Listbox): the listbox that shows the rows _window_start to _window_end - 1
+        _scrollbar (tkinter.ttk.Scrollbar): scrollbar of the listbox or None
+        _auctions (marketplace.auctions.Auctions): all auctions
+        _render (callable): returns the text of an auction in the listbox
+        _include (callable): returns True, if an auction belongs into the listbox, None for all of them
+        _hide_expired (bool): True, if auctions that have expired are never shown
+        _num_visible_rows (int): number of rows that the listbox shows at the same time
+        _auction_ids (list): auction_id of every row
+        _row_of_auction (dict): row of every auction (key = auction_id, value = row index)
+        _texts (dict): text that is shown for every auction in the window (key = auction_id)
+        _window_start (int): first row in the listbox
+        _window_end (int): row after the last row in the listbox
+        _top (int): first visible row
+        _selected_id (str): auction_id of the selected row, also if it is outside of the window, or None
+    """
+
+    # Anzahl der Zeilen, die zusätzlich über und unter den sichtbaren Zeilen in der Listbox stehen
+    OVERSCAN = 20
+
+    # *** CONSTRUCTORS ***
+    def __init__(self, listbox, auctions, render=None, scrollbar=None, hide_expired=True, num_visible_rows=None):
+        """
+
+        :param listbox: tkinter.Listbox
+        :param auctions: marketplace.auctions.Auctions
+        :param render: function auction -> text of the row. default: auction.pretty_print()
+        :param scrollbar: vertical scrollbar of the listbox, that is controlled by this view
+        :param hide_expired: True, if auctions that have expired should not be shown
+        :param num_visible_rows: number of rows that the listbox shows. default: height of the listbox
+        """
+        self._listbox = listbox
+        self._scrollbar = scrollbar
+        self._auctions = auctions
+        self._render = render if render is not None else lambda auction: auction.pretty_print()
+        self._include = None
+        self._hide_expired = hide_expired
+        if num_visible_rows is None:
+            num_visible_rows = int(listbox.cget("height"))
+        self._num_visible_rows = num_visible_rows
+
+        self._auction_ids = []
+        self._row_of_auction = {}
+        self._texts = {}
+
+        self._window_start = 0
+        self._window_end = 0
+        self._top = 0
+        self._selected_id = None
+
+        # die Listbox meldet jede Änderung ihrer Ansicht (Mausrad, Tastatur) an die View statt an die Scrollbar
+        listbox.config(yscrollcommand=self._on_listbox_yview)
+        listbox.bind("<<ListboxSelect>>", self._on_select, add="+")
+        if scrollbar is not None:
+            scrollbar.config(command=self.yview)
+
+    # *** PUBLIC methods ***
+
+    def show(self, auction_ids, include=None, render=None):
+        """
+        Shows exactly the given auctions in the given order. If they are the same auctions in the same order as
+        before, only the visible rows whose text has changed are replaced. Otherwise the list starts at the top again.
+        The selected auction stays selected.
+
+        :param auction_ids: auction_ids that should be shown
+        :param include: function auction_id -> True, if the auction belongs into the listbox, e.g. because it matches
+        a search. used by update() for auctions that are not in the listbox yet. default: all auctions
+        :param render: new function auction -> text of the row, None to keep the current one
+        :return:
+        """
+        self._include = include
+        auction_ids = list(auction_ids)
+
+        # _texts enthält, was gerade angezeigt wird, deshalb werden auch mit der neuen Funktion nur die Zeilen ersetzt,
+        # deren Text sich ändert
+        if render is not None:
+            self._render = render
+
+        if auction_ids == self._auction_ids:
+            self.update(auction_ids)
+            return
+
+        self._auction_ids = auction_ids
+        self._row_of_auction = {auction_id: row for row, auction_id in enumerate(auction_ids)}
+        if self._selected_id not in self._row_of_auction:
+            self._selected_id = None
+        self._top = 0
+        self._render_window(0)
+
+    def update(self, auction_ids):
+        """
+        Updates the rows of the given auctions, e.g. the auctions returned by Auctions.pop_dirty_auctions():
+        auctions that were deleted or have expired are removed, changed texts in the window are replaced and new
+        auctions are appended at the end. Auctions outside of the window are not rendered.
+
+        :param auction_ids: auction_ids of auctions that have changed
+        :return:
+        """
+        rows_removed = []
+        window_changed = False
+        for auction_id in auction_ids:
+            row = self._row_of_auction.get(auction_id)
+
+            if not self._belongs(auction_id):
+                if row is not None:
+                    rows_removed.append(row)
+                continue
+
+            if row is None:
+                row = len(self._auction_ids)
+                self._row_of_auction[auction_id] = row
+                self._auction_ids.append(auction_id)
+                # a new row directly below the window is needed, if the window is not full yet
+                window_changed = window_changed or row < self._window_start + self._window_size()
+            elif self._window_start <= row < self._window_end:
+                text = self._render(self._auctions[auction_id])
+                if self._texts.get(auction_id) != text:
+                    self._listbox.delete(row - self._window_start)
+                    self._listbox.insert(row - self._window_start, text)
+                    self._texts[auction_id] = text
+                    if auction_id == self._selected_id:
+                        self._listbox.selection_set(row - self._window_start)
+
+        if rows_removed:
+            self._remove_rows(rows_removed)
+            window_changed = window_changed or min(rows_removed) < self._window_end
+
+        if window_changed:
+            self._render_window(self._window_start)
+        else:
+            self._update_scrollbar()
+
+    def remove(self, auction_id):
+        """
+        Removes the row of the given auction, e.g. after it was deleted.
+        """
+        row = self._row_of_auction.get(auction_id)
+        if row is not None:
+            self._remove_rows([row])
+            self._render_window(self._window_start)
+
+    def select(self, auction_id):
+        """
+        Selects the row of the given auction in O(1) and scrolls to it, if the auction is shown in the listbox.
+
+        :return: row of the auction or None
+        """
+        row = self._row_of_auction.get(auction_id)
+        if row is not None:
+            self._selected_id = auction_id
+            if not self._top <= row < self._top + self._num_visible_rows:
+                self.scroll_to(row)
+            self._listbox.selection_clear(0, "end")
+            self._listbox.selection_set(row - self._window_start)
+        return row
+
+    def scroll_to(self, top):
+        """
+        Scrolls the list so that row top is the first visible row. The window is only filled again if rows outside of
+        it would become visible.
+        """
+        top = max(0, min(top, len(self._auction_ids) - self._num_visible_rows))
+        self._top = top
+        if self._in_window(top):
+            self._listbox.yview(top - self._window_start)
+            self._update_scrollbar()
+        else:
+            self._render_window(top - self.OVERSCAN)
+
+    def yview(self, *args):
+        """
+        Command of the scrollbar, called with ("moveto", fraction) or ("scroll", number, "units" or "pages").
+        """
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * len(self._auction_ids)))
+        elif args[0] == "scroll":
+            step = self._num_visible_rows if args[2] == "pages" else 1
+            self.scroll_to(self._top + int(args[1]) * step)
+
+    # *** PUBLIC GET methods ***
+
+    def get_selected_auction_id(self):
+        """
+
+        :return: auction_id of the selected row or None, if no row is selected
+        """
+        return self._selected_id
+
+    def get_auction_id(self, row):
+        return self._auction_ids[row]
+
+    def get_row(self, auction_id):
+        """
+
+        :return: row of the given auction or None, if it is not shown
+        """
+        return self._row_of_auction.get(auction_id)
+
+    def __contains__(self, auction_id):
+        return auction_id in self._row_of_auction
+
+    def __len__(self):
+        return len(self._auction_ids)
+
+    # *** PRIVATE methods ***
+
+    def _render_window(self, window_start):
+        """
+        Fills the listbox with the rows from window_start on. Only these rows are rendered.
+        """
+        num_rows = len(self._auction_ids)
+        window_start = max(0, min(window_start, num_rows - self._window_size()))
+        window_end = min(num_rows, window_start + self._window_size())
+        self._top = max(0, min(self._top, num_rows - self._num_visible_rows))
+
+        self._window_start = window_start
+        self._window_end = window_end
+        window_ids = self._auction_ids[window_start:window_end]
+        self._texts = {auction_id: self._render(self._auctions[auction_id]) for auction_id in window_ids}
+
+        self._listbox.delete(0, "end")
+        if window_ids:
+            self._listbox.insert("end", *(self._texts[auction_id] for auction_id in window_ids))
+
+        selected_row = self._row_of_auction.get(self._selected_id)
+        if selected_row is not None and window_start <= selected_row < window_end:
+            self._listbox.selection_set(selected_row - window_start)
+
+        self._listbox.yview(self._top - window_start)
+        self._update_scrollbar()
+
+    def _remove_rows(self, rows):
+        # von unten nach oben löschen, damit sich die Zeilennummern der noch zu löschenden Zeilen nicht verschieben
+        for row in sorted(rows, reverse=True):
+            auction_id = self._auction_ids.pop(row)
+            del self._row_of_auction[auction_id]
+            self._texts.pop(auction_id, None)
+            if auction_id == self._selected_id:
+                self._selected_id = None
+
+        # die Zeilen unterhalb der ersten gelöschten Zeile sind nach oben gerutscht
+        for row in range(min(rows), len(self._auction_ids)):
+            self._row_of_auction[self._auction_ids[row]] = row
+
+    def _in_window(self, top):
+        # vor und nach den sichtbaren Zeilen muss noch eine Zeile im Fenster sein, damit die Listbox selbst weiter
+        # scrollen kann, außer am Anfang bzw. Ende der Liste
+        return ((top > self._window_start or self._window_start == 0) and
+                (top + self._num_visible_rows < self._window_end or self._window_end == len(self._auction_ids)))
+
+    def _window_size(self):
+        return self._num_visible_rows + 2 * self.OVERSCAN
+
+    def _update_scrollbar(self):
+        if self._scrollbar is None:
+            return
+        num_rows = len(self._auction_ids)
+        if num_rows == 0:
+            self._scrollbar.set(0.0, 1.0)
+        else:
+            self._scrollbar.set(self._top / num_rows, min(1.0, (self._top + self._num_visible_rows) / num_rows))
+
+    def _on_listbox_yview(self, first, last):
+        # die Listbox wurde innerhalb des Fensters gescrollt (Mausrad, Pfeiltasten): neue erste sichtbare Zeile
+        top = self._window_start + round(float(first) * (self._window_end - self._window_start))
+        if top != self._top:
+            self.scroll_to(top)
+
+    def _on_select(self, event):
+        selection = self._listbox.curselection()
+        if selection:
+            self._selected_id = self._auction_ids[self._window_start + selection[0]]
+        else:
+            self._selected_id = None
+
+    def _belongs(self, auction_id):
+        if auction_id not in self._auctions:
+            return False
+        if self._hide_expired and self._auctions[auction_id].expired():
+            return False
+        return self._include is None or self._include(auction_id)
@@ -5,42 +5,60 @@ import marketplace.item
 import marketplace.users
 import marketplace.simulator
 from marketplace.max_heap import MaxHeap
+from marketplace.avl_tree import AVLTree
+from marketplace.trie import Trie
+from datetime import datetime
+import heapq
 import random
+import re
 import threading
 import csv
 
 
 # wenn man nur produkte ersteigern möchte, die in einem
-# preissegment sind, dann AVL-Baum sinnvoll. am besten dann alle Auktionen sowohl in Hashtabelle als auch in
-# AVL Baum speichern und je nachdem ob preissegment-filter in gui genutzt wird (müsste noch hinzugefügt
-# werden zu gui), nutzt man entweder AVL-Baum oder Hashtabelle.
+# preissegment sind, dann AVL-Baum sinnvoll. deshalb werden alle aktiven Auktionen sowohl in der Hashtabelle als auch
+# im AVL-Baum _price_index (sortiert nach aktuellem Preis) gespeichert. für Preisfilter wird der AVL-Baum genutzt,
+# sonst die Hashtabelle.
 class Auctions(dict):
     """
     Class representing a dictionary of auctions
 
     Attributes:
         _id_next_auction (int):
-        _heap (marketplace.max_heap.MaxHeap):
+        _heap (marketplace.max_heap.MaxHeap): active auctions by number of bids, only changed and read under _lock
         _users (marketplace.users.Users): contains all users of the platform
         _my_simulator (marketplace.simulator.Simulator): simulates other users selling and buying stuff
         _stop_event (threading.Event): needed to stop simulator when user wants to close application
+        _auctions_offered (dict): index of active auctions by seller (key = user_id, value = set of auction_ids)
+        _auctions_bid_in (dict): index of active auctions by bidder (key = user_id, value = set of auction_ids)
+        _auctions_sold (dict): index of successfully sold auctions by seller (key = user_id, value = set of
+        auction_ids)
+        _auctions_won (dict): index of sold auctions by purchaser (key = user_id, value = set of auction_ids)
+        _auctions_recommended (dict): index of active auctions by user they are recommended to (key = user_id,
+        value = set of auction_ids)
+        _expiry_heap (heap): min heap of tuples (auction_ends, auction_id) of auctions that are not yet settled. the
+        auction that ends next is at the root of the heap
+        _price_index (marketplace.avl_tree.AVLTree): active auctions sorted by their current price (key = price,
+        values = auction_ids)
+        _price_of_auction (dict): price under which an auction is stored in _price_index (key = auction_id)
+        _token_index (dict): inverted index of the words in item names and descriptions (key = token, value = set
+        of auction_ids)
+        _tokens_of_auction (dict): weight of every token of an auction, used for ranking and to remove the auction
+        from _token_index (key = auction_id, value = dict token -> weight)
+        _token_trie (marketplace.trie.Trie): all tokens of _token_index, to find the tokens that start with a search term
+        _position_of_auction (dict): position of every auction in the order in which the auctions were added, used
+        to return the auction_ids of the indexes in a stable order (key = auction_id)
+        _num_auctions_added (int): number of auctions added so far, the position of the next auction
+        _dirty_auctions (set): auction_ids of auctions that were added, deleted, bid on or settled since the last call
+        of pop_dirty_auctions()
+        _lock (threading.RLock): held by the methods that add, delete, bid on or settle auctions and by the methods
+        that read the indexes, the heaps and _dirty_auctions, because the simulator and the GUI call them from
+        different threads. The other getters and the Auction objects themselves are not protected by it
     """
 
-    def add_user_rating(self, seller_id: str, rating: int):
-        """
-        Allows users to rate a seller (1 to 5 stars).
-
-        Args:
-            seller_id (str): ID of the seller being rated.
-            rating (int): Rating value (1 to 5 stars).
-        """
-        if seller_id in self._users:
-            user = self._users[seller_id]
-            user.rate_user(rating)
-
-            # Update the MaxHeap with the new average rating
-            mean_rating = user.get_rating_stars_mean()
-            self._heap_users_rated.update(seller_id, mean_rating)
+    # Gewicht eines Wortes im Produktnamen bzw. in der Beschreibung für das Ranking der Suchergebnisse
+    TOKEN_WEIGHT_NAME = 3
+    TOKEN_WEIGHT_DESCRIPTION = 1
 
     # *** CONSTRUCTORS ***
     def __init__(self, csvfile, *args):
@@ -48,29 +66,45 @@ class Auctions(dict):
 
         self._id_next_auction = 0
 
-        try:
-            self._heap = MaxHeap()  # For auctions with the most bids
-        except NotImplementedError:
-            self._heap = None
+        # Indizes, damit get_auctions_offered() usw. nicht über alle Auktionen iterieren müssen
+        self._auctions_offered = {}
+        self._auctions_bid_in = {}
+        self._auctions_sold = {}
+        self._auctions_won = {}
+        self._auctions_recommended = {}
+        self._position_of_auction = {}
+        self._num_auctions_added = 0
 
-        # Create a MaxHeap to store top-rated users
-        self._heap_users_rated = MaxHeap()
+        # Auktionen sortiert nach Auktionsende, damit nicht alle Auktionen auf Ablauf geprüft werden müssen
+        self._expiry_heap = []
 
-        self._users = marketplace.users.Users("user.csv")
+        # aktive Auktionen sortiert nach aktuellem Preis (höchstes Gebot oder Mindestgebot) für Preisfilter
+        self._price_index = AVLTree()
+        self._price_of_auction = {}
 
-        self._read_auctions_from_csvfile(csvfile)
+        # invertierter Index über Produktnamen und Beschreibungen für search_auctions()
+        self._token_index = {}
+        self._tokens_of_auction = {}
+        self._token_trie = Trie()
 
-        self._place_random_bids(num_bids=10 * self._users.num_users())
+        # geänderte Auktionen, damit die GUI nur diese Zeilen ihrer Listen aktualisieren muss
+        self._dirty_auctions = set()
 
-        self._my_simulator = marketplace.simulator.Simulator()
+        # der Simulator bietet und erstellt Auktionen in einem Timer-Thread, während die GUI bietet und Auktionen
+        # abrechnet. _price_index (AVL-Baum), die Indizes, die Heaps und _dirty_auctions dürfen nicht gleichzeitig
+        # geändert werden, deshalb gibt es für alle zusammen nur dieses eine Lock.
+        # RLock, weil z.B. bid_in_auction() über __setitem__ usw. weitere gesperrte Methoden aufruft
+        self._lock = threading.RLock()
 
-        self._stop_event = threading.Event()
+        try:
+            self._heap = MaxHeap()  # For auctions with the most bids
+        except NotImplementedError:
+            self._heap = None
 
-        # TODO: für 2. Praktikum: erstelle hier ein MaxHeap, um den besten User/Verkäufer mit der Methode
-        #  get_top_rated_user() (s.u.) in konstanter Zeit zurück geben zu können. auf der GUI gibt es noch keinen Button
-        #  mit dem Sie andere Nutzer bewerten können. das wird alles simuliert in simulator.py. Sie können von jedem
-        #  User über die Methode user.User.get_rating_stars_mean() die mittlere Anzahl Sterne abfragen.
-        self._heap_users_rated = None
+        # MaxHeap mit der mittleren Anzahl Sterne jedes bewerteten Users, um den besten User/Verkäufer mit der Methode
+        # get_top_rated_user() (s.u.) in konstanter Zeit zurück geben zu können. Bewertungen werden über
+        # add_user_rating() abgegeben (simuliert in simulator.py). Schreiben und Lesen nur unter _lock
+        self._heap_users_rated = MaxHeap()
 
         self._users = marketplace.users.Users("user.csv")
 
@@ -87,6 +121,25 @@ class Auctions(dict):
     # *** PUBLIC SET methods ***
 
     # *** PUBLIC methods ***
+    def add_user_rating(self, seller_id: str, rating: int):
+        """
+        Allows users to rate a seller (1 to 5 stars). The mean rating of the seller is updated in
+        _heap_users_rated in O(log n).
+
+        Args:
+            seller_id (str): ID of the seller being rated.
+            rating (int): Rating value (1 to 5 stars).
+        """
+        # der Simulator bewertet in seinem Thread, gelesen wird im Thread der Benachrichtigungen und in der GUI
+        with self._lock:
+            if seller_id in self._users:
+                user = self._users[seller_id]
+                user.rate_user(rating)
+
+                # Update the MaxHeap with the new average rating
+                mean_rating = user.get_rating_stars_mean()
+                self._heap_users_rated.update(seller_id, mean_rating)
+
     def start_top_rated_user_notifications(self):
         """
         Periodically logs the top-rated user every 30 seconds.
@@ -118,29 +171,42 @@ class Auctions(dict):
         :param value_min: minimal value of the item in €
         :return:
         """
-        item = marketplace.item.Item(item_name, description, value_min)
+        item = marketplace.item.Item(item_name, description, float(value_min))
 
-        auction, auction_id = self._new_auction(user_id, item)
+        with self._lock:
+            auction, auction_id = self._new_auction(user_id, item)
 
-        self[auction_id] = auction
+            self[auction_id] = auction
 
         return auction
 
     def bid_in_auction(self, auction_id, user, bid_amount):
-        if auction_id in self:
-            success = self[auction_id].bid(user, bid_amount)
-            if success and self._heap is not None:
-                self._heap.update_bidders(auction_id, self[auction_id].bid_count())
-            return success
+        with self._lock:
+            if auction_id in self:
+                # auf abgelaufene oder abgerechnete Auktionen kann nicht mehr geboten werden, z.B. wenn die Zeile in
+                # der Liste noch nicht aktualisiert wurde
+                if self[auction_id].sold() or self[auction_id].expired():
+                    return False
+                success = self[auction_id].bid(user, bid_amount)
+                if success:
+                    self._mark_dirty(auction_id)
+                    self._update_price_index(self[auction_id])
+                    Auctions._index_add(self._auctions_bid_in, user.id(), auction_id)
+                    # bietet user jetzt, wird ihm die Auktion nicht mehr empfohlen (s. Auction.bid())
+                    Auctions._index_discard(self._auctions_recommended, user.id(), auction_id)
+                if success and self._heap is not None and auction_id in self._heap:
+                    self._heap.update_bidders(auction_id, self[auction_id].bid_count())
+                return success
 
     def delete(self, auction_id):
         # funktioniert nur, wenn noch niemand auf diese Auktion geboten hat, sonst kann man Auktion nicht löschen
         # muss dann auch item in self[auction_id] löschen, bzw. muss das?
-        if not self[auction_id].is_any_bidder():
-            del self[auction_id]
-            return True
-        else:
-            return False
+        with self._lock:
+            if not self[auction_id].is_any_bidder():
+                del self[auction_id]
+                return True
+            else:
+                return False
 
     def start_simulation_init(self, current_user_id):
         self._start_simulator(current_user_id)
@@ -152,15 +218,22 @@ class Auctions(dict):
             self._timer.cancel()
 
     def __delitem__(self, key):
-        super().__delitem__(key)
-        if self._heap is not None:
-            self._heap.remove(key)
+        with self._lock:
+            self._mark_dirty(key)
+            self._unindex_auction(self[key])
+            self._remove_from_price_index(key)
+            self._remove_from_token_index(key)
+            super().__delitem__(key)
+            del self._position_of_auction[key]
+            # abgerechnete Auktionen sind schon nicht mehr im Heap
+            if self._heap is not None and key in self._heap:
+                self._heap.remove(key)
 
     # wird bei self[auction_id] = auction aufgerufen
     def __setitem__(self, key, value):
-        super().__setitem__(key, value)
-        if self._heap is not None:
-            self._heap.add_auction(value.id(), value.bid_count())
+        with self._lock:
+            self._set_auction(key, value)
+            self._update_price_index(value)
 
     # *** PUBLIC GET methods ***
 
@@ -202,23 +275,55 @@ class Auctions(dict):
         return self[auction_id].get_highest_bidder()
 
     def get_auctions_offered(self, user_id):
-        return [auction_id for auction_id, auction in self.items()
-                if auction.seller_id() == user_id and not auction.sold()]
+        with self._lock:
+            return self._in_auction_order(self._auctions_offered.get(user_id, ()))
 
     def get_auctions_bid_in(self, user_id: str):
-        return [auction_id for auction_id, auction in self.items()
-                if auction.is_user_bidding(user_id) and not auction.sold()]
+        with self._lock:
+            return self._in_auction_order(self._auctions_bid_in.get(user_id, ()))
 
     def get_auctions_sold(self, user_id: str):
-        return [auction_id for auction_id, auction in self.items()
-                if auction.seller_id() == user_id and auction.sold_success()]
+        with self._lock:
+            return self._in_auction_order(self._auctions_sold.get(user_id, ()))
 
     def get_auctions_won(self, user_id: str):
-        return [auction_id for auction_id, auction in self.items() if auction.purchaser_id() == user_id]
+        with self._lock:
+            return self._in_auction_order(self._auctions_won.get(user_id, ()))
 
     def get_auctions_is_recommended(self, user_id: str):
-        return [auction_id for auction_id, auction in self.items()
-                if auction.is_recommended2user(user_id) and not auction.sold()]
+        with self._lock:
+            return self._in_auction_order(self._auctions_recommended.get(user_id, ()))
+
+    def get_auctions_in_price_range(self, price_min, price_max):
+        """
+        Returns the active auctions whose current price (highest bid, or minimum bid if nobody has bid yet) is
+        between price_min and price_max in O(log n + k).
+
+        :param price_min: lower bound of price in €
+        :param price_max: upper bound of price in €
+        :return: list of auction ids sorted ascending by price
+        """
+        with self._lock:
+            return [auction_id for node in self._price_index.find_range(float(price_min), float(price_max))
+                    for auction_id in node.values]
+
+    def get_auctions_cheapest(self, k):
+        """
+
+        :param k: number of auctions
+        :return: list of the ids of the k active auctions with the lowest current price, sorted ascending by price
+        """
+        with self._lock:
+            return self._price_index.first_values(k)
+
+    def get_auctions_priciest(self, k):
+        """
+
+        :param k: number of auctions
+        :return: list of the ids of the k active auctions with the highest current price, sorted descending by price
+        """
+        with self._lock:
+            return self._price_index.first_values(k, reverse=True)
 
     def get_is_user_bidding(self, auction_id, user_id):
         return self[auction_id].is_user_bidding(user_id)
@@ -249,7 +354,7 @@ class Auctions(dict):
             max_auction = max(friends_auctions, key=friends_auctions.get)
 
             # empfehle max_auction an user
-            self[max_auction].recommend2user(user_id)
+            self._recommend_auction(max_auction, user_id)
 
     def get_auctions_friends_bid_in(self, user_id: str):
         """
@@ -271,56 +376,46 @@ class Auctions(dict):
             max_auction = max(friends_auctions, key=friends_auctions.get)
 
             # empfehle max_auction an user
-            self[max_auction].recommend2user(user_id)
+            self._recommend_auction(max_auction, user_id)
 
     def get_top_rated_user(self, with_num_stars=False):
         """
-        Returns user ID of the top-rated user, leveraging the MaxHeap for efficiency.
+        Returns user ID of the top-rated user in O(1), leveraging the MaxHeap _heap_users_rated.
 
         Args:
             with_num_stars (bool): If True, return stars together with user_id.
 
         Returns:
             str or tuple: User ID of the top-rated user, or (average_stars, user_id) if with_num_stars is True.
+            None, if no user has been rated yet.
         """
-        if not self._heap_users_rated:
-            return None
+        with self._lock:
+            if not self._heap_users_rated:
+                return None
 
-        top_user = self._heap_users_rated.get_top_user()
+            top_user = self._heap_users_rated.get_max()
         if with_num_stars:
             return top_user  # Returns (mean_stars, user_id)
         else:
             return top_user[1]  # Returns only user_id
 
-    # TODO: in 3. Praktikum: nutze diese Methode und passe diese evtl. an
-    def get_top_rated_user(self, with_num_stars=False):
-        """
-        Returns user ID of user that got the highest rating of other users
-        :param with_num_stars: if True, then return stars together with user_id, else only return user_id
-        :return:
+    def get_top_rated_users(self, k, with_num_stars=False):
         """
-        # TODO: do not use this part
-        # stupid brute force implementation
-        max_user = None
-        max_stars = 0
-        for user_id, user in self._users.items():
-            stars_mean = user.get_rating_stars_mean()
-            if stars_mean > max_stars:
-                max_stars = stars_mean
-                max_user = user_id
+        Returns the k top-rated users in descending order of their average rating in O(k log k).
+
+        Args:
+            k (int): number of users to return.
+            with_num_stars (bool): If True, return stars together with user_id.
 
+        Returns:
+            list: User IDs, or tuples (average_stars, user_id) if with_num_stars is True.
+        """
+        with self._lock:
+            top_users = self._heap_users_rated.get_top_k(k)
         if with_num_stars:
-            return [max_stars, max_user]
+            return top_users
         else:
-            return max_user
-
-        # TODO: instead use and probably change this
-        # if not self._heap_users_rated:
-        #     return None
-        # if with_num_stars:
-        #     return self._heap_users_rated.get_top_user()
-        # else:
-        #     return self._heap_users_rated.get_top_user()[1]
+            return [user_id for _, user_id in top_users]
 
     def get_active_auctions(self):
         auctions_active = {}
@@ -330,6 +425,52 @@ class Auctions(dict):
 
         return auctions_active
 
+    def pop_dirty_auctions(self):
+        """
+        Returns the auctions that have changed since the last call and starts a new, empty set. The simulator changes
+        auctions in another thread, therefore the set is swapped under _lock: the returned set is no longer changed
+        by _mark_dirty() and can be iterated safely.
+
+        :return: set of auction_ids of auctions that were added, deleted, bid on or settled
+        """
+        with self._lock:
+            dirty_auctions, self._dirty_auctions = self._dirty_auctions, set()
+        return dirty_auctions
+
+    def search_auctions(self, search_term, match_all=True):
+        """
+        Searches for auctions whose item name or description contains words that start with the words of the search
+        term. Uses the inverted index _token_index, so the runtime depends on the number of matching auctions and not
+        on the number of all auctions.
+
+        :param search_term: words separated by blanks or punctuation, upper and lower case is ignored
+        :param match_all: True, if an auction has to match all words of the search term (AND), False, if it is enough
+        to match one of them (OR)
+        :return: list of auction_ids, sorted by the number of matched words, then by the weight of the matched words
+        (words in the item name count more than words in the description)
+        """
+        search_tokens = set(Auctions._tokenize(search_term))
+
+        # für jede gefundene Auktion: [Anzahl passender Suchwörter, Summe der Gewichte]
+        scores = {}
+        with self._lock:
+            for search_token in search_tokens:
+                weights = {}
+                for token in self._token_trie.search(search_token):
+                    for auction_id in self._token_index.get(token, ()):
+                        weight = self._tokens_of_auction[auction_id][token]
+                        weights[auction_id] = max(weight, weights.get(auction_id, 0))
+
+                for auction_id, weight in weights.items():
+                    score = scores.setdefault(auction_id, [0, 0])
+                    score[0] += 1
+                    score[1] += weight
+
+        if match_all:
+            scores = {auction_id: score for auction_id, score in scores.items() if score[0] == len(search_tokens)}
+
+        return sorted(scores, key=lambda auction_id: (-scores[auction_id][0], -scores[auction_id][1], auction_id))
+
     # *** PUBLIC STATIC methods ***
     def get_top_auction(self, with_num_bids=False):
         """
@@ -342,10 +483,11 @@ class Auctions(dict):
         Returns:
             str or tuple: Auction ID or (number of bids, auction ID).
         """
-        if not self._heap:
-            return None
+        with self._lock:
+            if not self._heap:
+                return None
 
-        top_auction = self._heap.get_auction_with_max_bidders()
+            top_auction = self._heap.get_auction_with_max_bidders()
         if with_num_bids:
             return top_auction  # Returns (num_bids, auction_id)
         else:
@@ -391,8 +533,7 @@ class Auctions(dict):
 
         auctions = marketplace.auctions.Auctions.sort_time_left(auctions)
 
-        for auction in auctions:
-            self[auction] = auctions[auction]
+        self._add_auctions(auctions)
 
     def _place_random_bids(self, num_bids=10, user_ids=None, show_message=False, current_user_id=None):
         """
@@ -438,7 +579,7 @@ class Auctions(dict):
 
         self._my_simulator.create_random_auctions(self, current_user_id)
 
-        self._my_simulator.randomly_rate_users(self._users, current_user_id)
+        self._my_simulator.randomly_rate_users(self, current_user_id)
 
         timer = threading.Timer(30, self._start_simulator, args=(current_user_id,))
         timer.start()
@@ -450,39 +591,250 @@ class Auctions(dict):
         :param auction_id:
         :return:
         """
-        # setze Verkäufer
-        purchaser_id = self[auction_id].set_purchaser_id()
-        seller_id = self[auction_id].seller_id()
-        highest_bid = self[auction_id].get_highest_bid()
+        with self._lock:
+            # Auktion ist nicht mehr aktiv, deshalb aus den Indizes der aktiven Auktionen entfernen
+            self._unindex_auction(self[auction_id])
+
+            # setze Verkäufer
+            purchaser_id = self[auction_id].set_purchaser_id()
+            self._mark_dirty(auction_id)
+
+            self._index_auction(self[auction_id])
+            self._remove_from_price_index(auction_id)
+
+            seller_id = self[auction_id].seller_id()
+            highest_bid = self[auction_id].get_highest_bid()
+
+            if self._heap is not None and auction_id in self._heap:
+                self._heap.remove(auction_id)
+
+            # purchaser_id kann auch "Kein Bieter" oder None sein.
+            if purchaser_id in self._users:
+                # dem Verkäufer wird der Verkaufspreis überwiesen
+                self._users[seller_id].increase_balance(highest_bid)
+
+                # muss allen Aktionären, die nicht gewonnen haben das Geld zurückerstatten,
+                # da dieses bereits beim Bieten von Balance abgezogen wurde, oder ich verkleinere balance
+                # erst beim Verkauf. führt dazu, dass man Schulden machen könnte
+                for (bid_of_user, user_id) in self[auction_id].users_bidding():
+                    if user_id != purchaser_id:
+                        # print(bid_of_user, user_id)
+                        # minus sign, da Angebot negativ ist, wg. min-heap
+                        self._users[user_id].increase_balance(-bid_of_user)
+
+                return True
+            else:  # dann ist Auktion ausgelaufen, aber es gab keinen Käufer
+                return False
+
+    def _recommend_auction(self, auction_id, user_id):
+        """
+        Recommends the given auction to user_id, unless user_id is already bidding on it.
+
+        :param auction_id: id of auction to recommend
+        :param user_id: id of user the auction is recommended to
+        """
+        with self._lock:
+            auction = self[auction_id]
+            if not auction.is_user_bidding(user_id):
+                auction.recommend2user(user_id)
+                if not auction.sold():
+                    Auctions._index_add(self._auctions_recommended, user_id, auction_id)
+
+    def _index_auction(self, auction):
+        """
+        Adds the given auction to the indexes _auctions_offered, _auctions_bid_in, _auctions_recommended if it is
+        still active, else to _auctions_sold and _auctions_won.
+
+        :param auction: marketplace.auction.Auction
+        """
+        auction_id = auction.id()
+        if not auction.sold():
+            Auctions._index_add(self._auctions_offered, auction.seller_id(), auction_id)
+            for _, user_id in auction.users_bidding():
+                Auctions._index_add(self._auctions_bid_in, user_id, auction_id)
+            for user_id in auction.recommended2users():
+                if not auction.is_user_bidding(user_id):
+                    Auctions._index_add(self._auctions_recommended, user_id, auction_id)
+        else:
+            if auction.sold_success():
+                Auctions._index_add(self._auctions_sold, auction.seller_id(), auction_id)
+                Auctions._index_add(self._auctions_won, auction.purchaser_id(), auction_id)
+
+    def _unindex_auction(self, auction):
+        """
+        Removes the given auction from all indexes.
+
+        :param auction: marketplace.auction.Auction
+        """
+        auction_id = auction.id()
+        Auctions._index_discard(self._auctions_offered, auction.seller_id(), auction_id)
+        Auctions._index_discard(self._auctions_sold, auction.seller_id(), auction_id)
+        Auctions._index_discard(self._auctions_won, auction.purchaser_id(), auction_id)
+        for _, user_id in auction.users_bidding():
+            Auctions._index_discard(self._auctions_bid_in, user_id, auction_id)
+        for user_id in auction.recommended2users():
+            Auctions._index_discard(self._auctions_recommended, user_id, auction_id)
+
+    def _set_auction(self, key, value):
+        """
+        Stores the given auction and adds it to all indexes except _price_index. Must be called under _lock.
+        """
+        if key in self:
+            self._unindex_auction(self[key])
+        else:
+            self._position_of_auction[key] = self._num_auctions_added
+            self._num_auctions_added += 1
+        super().__setitem__(key, value)
+        self._mark_dirty(key)
+        self._index_auction(value)
+        self._add_to_token_index(value)
+        if not value.sold():
+            heapq.heappush(self._expiry_heap, (value.auction_ends(), key))
+        if self._heap is not None and not value.sold():
+            if key in self._heap:
+                self._heap.update_bidders(key, value.bid_count())
+            else:
+                self._heap.add_auction(key, value.bid_count())
+
+    def _add_auctions(self, auctions):
+        """
+        Adds many new auctions at once, like self[auction_id] = auction for each of them. The active auctions are
+        added to _price_index with a single AVLTree.extend(), which rebuilds the tree in O(n + m log m) instead of
+        m rotating insertions.
+
+        :param auctions: dict of new auctions (key = auction_id, value = marketplace.auction.Auction)
+        """
+        prices = []
+        with self._lock:
+            for auction_id, auction in auctions.items():
+                self._set_auction(auction_id, auction)
+                if not auction.sold():
+                    price = Auctions._current_price(auction)
+                    self._price_of_auction[auction_id] = price
+                    prices.append((price, auction_id))
+            self._price_index.extend(prices)
+
+    def _update_price_index(self, auction):
+        """
+        Stores the given auction in _price_index under its current price, if it is still active.
+
+        :param auction: marketplace.auction.Auction
+        """
+        auction_id = auction.id()
+        price = Auctions._current_price(auction)
+
+        if self._price_of_auction.get(auction_id) == price:
+            return
+
+        self._remove_from_price_index(auction_id)
+        if not auction.sold():
+            self._price_index.insert(price, auction_id)
+            self._price_of_auction[auction_id] = price
+
+    def _remove_from_price_index(self, auction_id):
+        price = self._price_of_auction.pop(auction_id, None)
+        if price is not None:
+            self._price_index.remove_value(price, auction_id)
+
+    def _add_to_token_index(self, auction):
+        """
+        Adds the words of the item name and description of the given auction to _token_index. Name and description of
+        an item never change, so an auction that is already in the index is skipped.
+
+        :param auction: marketplace.auction.Auction
+        """
+        auction_id = auction.id()
+        if auction_id in self._tokens_of_auction:
+            return
 
-        if self._heap is not None:
-            self._heap.remove(auction_id)
+        tokens = {}
+        for token in Auctions._tokenize(auction.get_item_name()):
+            tokens[token] = tokens.get(token, 0) + self.TOKEN_WEIGHT_NAME
+        for token in Auctions._tokenize(auction.get_item_description()):
+            tokens[token] = tokens.get(token, 0) + self.TOKEN_WEIGHT_DESCRIPTION
 
-        # purchaser_id kann auch "Kein Bieter" oder None sein.
-        if purchaser_id in self._users:
-            # dem Verkäufer wird der Verkaufspreis überwiesen
-            self._users[seller_id].increase_balance(highest_bid)
+        self._tokens_of_auction[auction_id] = tokens
+        for token in tokens:
+            if token not in self._token_index:
+                self._token_trie.insert(token)
+            Auctions._index_add(self._token_index, token, auction_id)
 
-            # muss allen Aktionären, die nicht gewonnen haben das Geld zurückerstatten,
-            # da dieses bereits beim Bieten von Balance abgezogen wurde, oder ich verkleinere balance
-            # erst beim Verkauf. führt dazu, dass man Schulden machen könnte
-            for (bid_of_user, user_id) in self[auction_id].users_bidding():
-                if user_id != purchaser_id:
-                    # print(bid_of_user, user_id)
-                    # minus sign, da Angebot negativ ist, wg. min-heap
-                    self._users[user_id].increase_balance(-bid_of_user)
+    def _remove_from_token_index(self, auction_id):
+        # Tokens ohne Auktion bleiben im Trie, haben aber keinen Eintrag mehr in _token_index
+        for token in self._tokens_of_auction.pop(auction_id, ()):
+            Auctions._index_discard(self._token_index, token, auction_id)
 
-            return True
-        else:  # dann ist Auktion ausgelaufen, aber es gab keinen Käufer
-            return False
+    def _mark_dirty(self, auction_id):
+        # wird nur von Methoden aufgerufen, die _lock halten
+        self._dirty_auctions.add(auction_id)
+
+    def _in_auction_order(self, auction_ids):
+        """
+        Returns the given auction_ids in the order in which the auctions were added, like iterating over all auctions.
+
+        :param auction_ids: set of auction_ids from one of the indexes
+        :return: sorted list of auction_ids
+        """
+        return sorted(auction_ids, key=self._position_of_auction.__getitem__)
+
+    @staticmethod
+    def _current_price(auction):
+        # höchstes Gebot oder Mindestgebot, falls noch niemand geboten hat
+        if auction.is_any_bidder():
+            return float(auction.get_highest_bid())
+        return float(auction.get_item_value_min())
+
+    @staticmethod
+    def _tokenize(text):
+        return re.findall(r"\w+", text.lower())
+
+    @staticmethod
+    def _index_add(index, key, auction_id):
+        index.setdefault(key, set()).add(auction_id)
+
+    @staticmethod
+    def _index_discard(index, key, auction_id):
+        auction_ids = index.get(key)
+        if auction_ids is not None:
+            auction_ids.discard(auction_id)
+            if not auction_ids:
+                del index[key]
 
     # ...............
 
     def handle_expired_auction(self, auction_id):
-        if not self[auction_id].sold():
-            return self._set_purchaser_id(auction_id)
-        else:
-            return False
+        with self._lock:
+            if not self[auction_id].sold():
+                return self._set_purchaser_id(auction_id)
+            else:
+                return False
+
+    def handle_expired_auctions(self):
+        """
+        Settles all auctions that expired since the last call by calling handle_expired_auction(). Only the auctions
+        that crossed their end time are taken from the root of _expiry_heap, so the cost is O(k log n) for k expired
+        auctions. The auctions are settled under _lock, so no bid of the simulator can arrive in between.
+
+        :return: list of tuples (auction_id, success) of the auctions that were settled, where success is the return
+        value of handle_expired_auction()
+        """
+        now = datetime.now()
+        auctions_expired = []
+
+        # der Simulator legt in seinem Thread neue Auktionen in _expiry_heap ab und bietet auf die Auktionen, die hier
+        # abgerechnet werden
+        with self._lock:
+            while self._expiry_heap and self._expiry_heap[0][0] <= now:
+                auction_ends, auction_id = heapq.heappop(self._expiry_heap)
+
+                # Auktion kann inzwischen gelöscht oder schon abgerechnet worden sein
+                auction = self.get(auction_id)
+                if auction is None or auction.sold() or auction.auction_ends() != auction_ends:
+                    continue
+
+                auctions_expired.append((auction_id, self.handle_expired_auction(auction_id)))
+
+        return auctions_expired
 
     # *** PUBLIC methods to return class properties ***
 
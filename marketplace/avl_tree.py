@@ -1,8 +1,72 @@
 # Die Klasse AVLTree implementiert einen AVL-Baum
+# Jeder Knoten kennt zusätzlich die Anzahl der Knoten in seinem Teilbaum (size), damit rank(), select() und
+# count_range() in O(log n) beantwortet werden können, und den größten ersten Wert in seinem Teilbaum (max_value),
+# damit find_most_likely_words() die häufigsten Wörter mit einer Bestensuche findet, ohne alle Treffer zu besuchen.
+import heapq
+
+
 class AVLTree:
     def __init__(self):
         self.root = None
 
+    def __len__(self):
+        return self.get_size(self.root)
+
+    @classmethod
+    def from_sorted(cls, items):
+        """
+            Build a perfectly balanced Tree from (key, value) pairs that are sorted by key in O(n), instead of
+            inserting them one by one in O(n log n). String keys are lower-cased like in insert(), pairs with the
+            same key are stored in one Node.
+
+            Raises:
+            -------
+            ValueError if the keys are not sorted.
+        """
+        keys = []
+        values = []
+        for key, value in items:
+            if isinstance(key, str):
+                key = key.lower()
+            if keys and key == keys[-1]:
+                values[-1].append(value)
+                continue
+            if keys and key < keys[-1]:
+                raise ValueError("from_sorted: keys must be sorted")
+            keys.append(key)
+            values.append([value])
+
+        tree = cls()
+        tree._build_balanced(keys, values)
+        return tree
+
+    def extend(self, items):
+        """
+            Insert many (key, value) pairs at once. If there are many pairs compared to the size of the Tree, the
+            Nodes of the Tree and the sorted pairs are merged and the Tree is rebuilt in O(n + m log m), else the
+            pairs are inserted one by one in O(m log n).
+        """
+        items = [(key.lower() if isinstance(key, str) else key, value) for key, value in items]
+
+        # einzeln einfügen lohnt sich nur, solange m * log(n) kleiner als n ist
+        if len(items) * max(self.height(), 1) < len(self):
+            for key, value in items:
+                self.insert(key, value)
+            return
+
+        items.sort(key=lambda item: item[0])
+
+        keys = []
+        values = []
+        for key, value in items:
+            if keys and key == keys[-1]:
+                values[-1].append(value)
+            else:
+                keys.append(key)
+                values.append([value])
+
+        self._merge_sorted(keys, values)
+
     def __repr__(self):
         if self.root is None:
             return ''
@@ -57,6 +121,7 @@ class AVLTree:
     def insert(self, key, value):
         """
             Insert a new Node into the Tree. If the key already exists the associated Node will be updated.
+            The tree is traversed iteratively, so no recursion is needed on large trees.
 
             Return:
             -------
@@ -64,79 +129,129 @@ class AVLTree:
             If the Key does exist return the Node that has been updated.
         """
 
+        # Strings werden klein geschrieben gespeichert, andere Schlüssel (z. B. Preise) unverändert
+        if isinstance(key, str):
+            key = key.lower()
+
         if self.root is None:
-            new_node = self.create_new_node(key.lower(), value)
+            new_node = self.create_new_node(key, value)
             self.root = new_node
             return new_node
-        else:
-            return self._insert(key.lower(), value, self.root)
-
-    def _insert(self, key, value, cur_node):
-        if key < cur_node.key:
-            if cur_node.left_child is None:
-                new_node = self.create_new_node(key, value)
-                cur_node.left_child = new_node
-                cur_node.left_child.parent = cur_node  # set parent
-                self._inspect_insertion(cur_node.left_child)
-                return new_node
-            else:
-                return self._insert(key, value, cur_node.left_child)
-        elif key > cur_node.key:
-            if cur_node.right_child is None:
-                new_node = self.create_new_node(key, value)
-                cur_node.right_child = new_node
-                cur_node.right_child.parent = cur_node  # set parent
-                self._inspect_insertion(cur_node.right_child)
-                return new_node
+
+        cur_node = self.root
+        while True:
+            if key < cur_node.key:
+                if cur_node.left_child is None:
+                    new_node = self.create_new_node(key, value)
+                    cur_node.left_child = new_node
+                    break
+                cur_node = cur_node.left_child
+            elif key > cur_node.key:
+                if cur_node.right_child is None:
+                    new_node = self.create_new_node(key, value)
+                    cur_node.right_child = new_node
+                    break
+                cur_node = cur_node.right_child
             else:
-                return self._insert(key, value, cur_node.right_child)
-        elif key == cur_node.key:
-            updated_node = self.update_node(cur_node, value)
-            return updated_node
+                return self.update_node(cur_node, value)
+
+        new_node.parent = cur_node  # set parent
+
+        # every Node on the path to the root now has one more Node in its subtree
+        while cur_node is not None:
+            cur_node.size += 1
+            self._update_max_value(cur_node)
+            cur_node = cur_node.parent
+
+        self._inspect_insertion(new_node)
+        return new_node
 
     def print_tree(self):
-        if self.root is not None:
-            self._print_tree(self.root)
+        for node in self.nodes():
+            print('%s, h=%d' % (str(node.key), node.height))
 
-    def _print_tree(self, cur_node):
-        if cur_node is not None:
-            self._print_tree(cur_node.left_child)
-            print('%s, h=%d' % (str(cur_node.key), cur_node.height))
-            self._print_tree(cur_node.right_child)
+    def nodes(self, reverse=False):
+        """
+            Iterates over all Nodes in ascending order of their keys (descending if reverse is True).
+            Uses an explicit stack instead of recursion.
+        """
+        stack = []
+        cur_node = self.root
+        while stack or cur_node is not None:
+            if cur_node is not None:
+                stack.append(cur_node)
+                cur_node = cur_node.right_child if reverse else cur_node.left_child
+            else:
+                cur_node = stack.pop()
+                yield cur_node
+                cur_node = cur_node.left_child if reverse else cur_node.right_child
 
     def height(self):
-        if self.root is not None:
-            return self._height(self.root, 0)
-        else:
-            return 0
-
-    def _height(self, cur_node, cur_height):
-        if cur_node is None:
-            return cur_height
-        left_height = self._height(cur_node.left_child, cur_height + 1)
-        right_height = self._height(cur_node.right_child, cur_height + 1)
-        return max(left_height, right_height)
+        # the height of every Node is kept up to date during insertion and deletion
+        return self.get_height(self.root)
 
     def find(self, key):
-        if self.root is not None:
-            return self._find(key, self.root)
-        else:
-            return None
+        cur_node = self.root
+        while cur_node is not None:
+            if key < cur_node.key:
+                cur_node = cur_node.left_child
+            elif key > cur_node.key:
+                cur_node = cur_node.right_child
+            else:
+                return cur_node
+        return None
 
-    def _find(self, key, cur_node):
-        if key == cur_node.key:
-            return cur_node
-        elif key < cur_node.key and cur_node.left_child is not None:
-            return self._find(key, cur_node.left_child)
-        elif key > cur_node.key and cur_node.right_child is not None:
-            return self._find(key, cur_node.right_child)
+    def rank(self, key):
+        """
+            Returns the number of keys in the Tree that are smaller than key in O(log n).
+        """
+        return self._count_smaller(key, False)
+
+    def select(self, index):
+        """
+            Returns the Node with the index-th smallest key (starting at 0) in O(log n).
+
+            Raises:
+            -------
+            IndexError if index is not between 0 and len(tree) - 1.
+        """
+        if not 0 <= index < len(self):
+            raise IndexError("select: index out of range")
+
+        cur_node = self.root
+        while True:
+            left_size = self.get_size(cur_node.left_child)
+            if index < left_size:
+                cur_node = cur_node.left_child
+            elif index > left_size:
+                index -= left_size + 1
+                cur_node = cur_node.right_child
+            else:
+                return cur_node
+
+    def count_range(self, start_key, end_key):
+        """
+            Returns the number of keys with start_key <= key <= end_key in O(log n).
+        """
+        if end_key < start_key:
+            return 0
+        return self._count_smaller(end_key, True) - self._count_smaller(start_key, False)
+
+    def _count_smaller(self, key, inclusive):
+        # counts the keys < key (<= key if inclusive) by adding the size of every left subtree that is passed
+        count = 0
+        cur_node = self.root
+        while cur_node is not None:
+            if cur_node.key < key or (inclusive and cur_node.key == key):
+                count += self.get_size(cur_node.left_child) + 1
+                cur_node = cur_node.right_child
+            else:
+                cur_node = cur_node.left_child
+        return count
 
     # TODO: Schauen Sie sich diese Methode ganz genau an. Wie wird der AVL-Baum durchlaufen? Zeichnen Sie
     #  am besten einen AVL-Baum und gehen Sie mit dieser Methode Schritt für Schritt durch diesen Baum
-    def find_most_likely_words(self, prefix: str):
-        # Initialisiere ein leeres Wörterbuch, um die Wörter und ihre Werte zu speichern
-        words_dict = dict()
-
+    def find_most_likely_words(self, prefix: str, num_words=None):
         # Definiere den Suchbereich basierend auf dem Präfix:
         # - Das Präfix selbst wird in Kleinbuchstaben konvertiert
         start_word = prefix.lower()
@@ -144,43 +259,94 @@ class AVLTree:
         # - Das Ende des Suchbereichs wird durch Inkrementieren des letzten Buchstabens festgelegt
         end_word = start_word[:-1] + str(chr(ord(start_word[-1]) + 1))
 
-        # Beginne die Suche nur, wenn der Baum nicht leer ist
+        # Bestensuche mit einem Heap statt alle Treffer zu sammeln und zu sortieren. Im Heap liegen
+        # - Teilbäume, die Schlüssel zwischen `start_word` und `end_word` enthalten können, mit dem größten Wert des
+        #   Teilbaums (max_value) als Schranke
+        # - einzelne Wörter aus diesem Bereich mit ihrem Wert
+        # Ein Wort wird erst ausgegeben, wenn kein Teilbaum mit einer größeren Schranke mehr im Heap liegt. Nur die
+        # Knoten auf den beiden Rändern des Bereichs haben Schranken von Schlüsseln außerhalb des Bereichs, deshalb
+        # kostet die Suche O((log n + `num_words`) log n). Bei gleichem Wert werden Teilbäume zuerst expandiert,
+        # damit gleich häufige Wörter alphabetisch sortiert ausgegeben werden.
+        sorted_words = []
+        heap = []
         if self.root is not None:
-            # Überprüfe, ob der `key` der Wurzel zwischen `start_word` und `end_word` liegt
-            if start_word < self.root.key < end_word:
-                # Füge den `key` und den ersten Wert des Wurzelnodes zum Wörterbuch hinzu
-                words_dict[self.root.key] = self.root.values[0]
-
-                # Durchsuche rekursiv sowohl den linken als auch den rechten Kindknoten
-                self._find_most_likely_words(self.root.left_child, words_dict, start_word, end_word)
-                self._find_most_likely_words(self.root.right_child, words_dict, start_word, end_word)
-            elif self.root.key <= start_word:
-                # Wenn der `key` der Wurzel kleiner oder gleich `start_word` ist,
-                # suche nur im rechten Teilbaum
-                self._find_most_likely_words(self.root.right_child, words_dict, start_word, end_word)
-            elif self.root.key >= end_word:
-                # Wenn der `key` der Wurzel größer oder gleich `end_word` ist,
-                # suche nur im linken Teilbaum
-                self._find_most_likely_words(self.root.left_child, words_dict, start_word, end_word)
-
-        # Sortiere die Wörter in `words_dict` nach ihren Werten in absteigender Reihenfolge (sortierte Liste)
-        sorted_words = [product for product, count in sorted(words_dict.items(), key=lambda x: x[1], reverse=True)]
-
-        # Gib die sortierte Liste der erwarteten Wörter zurück
-        return sorted_words
+            heap.append((-self.root.max_value, 0, self.root.key, self.root))
+        while heap and (num_words is None or len(sorted_words) < num_words):
+            _, is_word, key, node = heapq.heappop(heap)
+            if is_word:
+                sorted_words.append(key)
+                continue
 
+            if start_word < node.key < end_word:
+                heapq.heappush(heap, (-node.values[0], 1, node.key, node))
+            # der linke Teilbaum kann nur Schlüssel > `start_word` enthalten, wenn `key` > `start_word` ist, der
+            # rechte nur Schlüssel < `end_word`, wenn `key` < `end_word` ist
+            if node.left_child is not None and node.key > start_word:
+                heapq.heappush(heap, (-node.left_child.max_value, 0, node.left_child.key, node.left_child))
+            if node.right_child is not None and node.key < end_word:
+                heapq.heappush(heap, (-node.right_child.max_value, 0, node.right_child.key, node.right_child))
+
+        # Gib die Wörter sortiert nach ihren Werten in absteigender Reihenfolge zurück
+        return sorted_words
 
-    def _find_most_likely_words(self, node, words_dict: dict, start_word: str, end_word: str):
+    def find_range(self, start_key, end_key):
+        """
+            Returns all Nodes with start_key <= key <= end_key in ascending order of their keys.
+            Only the subtrees that can contain such keys are visited, so the cost is O(log n + k) for k Nodes.
+        """
+        nodes = []
+        stack = []
+        cur_node = self.root
+        while stack or cur_node is not None:
+            if cur_node is not None:
+                stack.append(cur_node)
+                # der linke Teilbaum kann nur Schlüssel >= start_key enthalten, wenn der Knoten größer ist
+                cur_node = cur_node.left_child if start_key < cur_node.key else None
+            else:
+                cur_node = stack.pop()
+                if cur_node.key > end_key:
+                    break
+                if cur_node.key >= start_key:
+                    nodes.append(cur_node)
+                cur_node = cur_node.right_child
+        return nodes
+
+    def first_values(self, num_values, reverse=False):
+        """
+            Returns the first num_values values in ascending order of their keys (descending if reverse is True).
+            The traversal stops as soon as enough values are found, so the cost is O(log n + num_values).
+        """
+        values = []
+        if num_values <= 0:
+            return values
+        for node in self.nodes(reverse):
+            for value in node.values:
+                values.append(value)
+                if len(values) >= num_values:
+                    return values
+        return values
+
+    def remove_value(self, key, value):
+        """
+            Removes value from the Node with the given key. The Node is deleted if it has no values left.
 
-        if node is not None:
-            if start_word < node.key < end_word:
-                words_dict[node.key] = node.values[0]
-                self._find_most_likely_words(node.left_child, words_dict, start_word, end_word)
-                self._find_most_likely_words(node.right_child, words_dict, start_word, end_word)
-            elif node.key <= start_word:
-                self._find_most_likely_words(node.right_child, words_dict, start_word, end_word)
-            elif node.key >= end_word:
-                self._find_most_likely_words(node.left_child, words_dict, start_word, end_word)
+            Return:
+            -------
+            True if the value was found and removed, else False.
+        """
+        node = self.find(key)
+        if node is None or value not in node.values:
+            return False
+        node.values.remove(value)
+        if not node.values:
+            self.delete_node(node)
+        else:
+            # the first value of the Node may have changed
+            cur_node = node
+            while cur_node is not None:
+                self._update_max_value(cur_node)
+                cur_node = cur_node.parent
+        return True
 
     def delete_key(self, key):
         return self.delete_node(self.find(key))
@@ -191,144 +357,166 @@ class AVLTree:
         # Improvements since prior lesson
 
         # Protect against deleting a Node not found in the tree
-        if node is None or self.find(node.key) is None:
+        if node is None or self.find(node.key) is not node:
             print("Node to be deleted not found in the tree!")
             return None
 
         # -----
 
-        # returns the Node with min key in tree rooted at input Node
-        def min_key_node(n):
-            current = n
-            while current.left_child is not None:
-                current = current.left_child
-            return current
-
-        # returns the number of children for the specified Node
-        def num_children(n):
-            num_child = 0
-            if n.left_child is not None:
-                num_child += 1
-            if n.right_child is not None:
-                num_child += 1
-            return num_child
-
-        # get the parent of the Node to be deleted
-        node_parent = node.parent
-
-        # get the number of children of the Node to be deleted
-        node_children = num_children(node)
-
-        # break operation into different cases based on the
-        # structure of the tree & Node to be deleted
-
-        # CASE 1 (Node has no children)
-        if node_children == 0:
+        # CASE 3 (Node has two children)
+        if node.left_child is not None and node.right_child is not None:
+            # get the inorder successor of the deleted Node
+            successor = node.right_child
+            while successor.left_child is not None:
+                successor = successor.left_child
 
-            if node_parent is not None:
-                # remove reference to the Node from the parent
-                if node_parent.left_child == node:
-                    node_parent.left_child = None
-                else:
-                    node_parent.right_child = None
-            else:
-                self.root = None
+            # copy the inorder successor's key and values to the Node formerly
+            # holding the key we wished to delete, then delete the successor
+            # instead. the successor has no left child, so one of the cases below applies
+            node.key = successor.key
+            node.values = successor.values
+            node = successor
 
-        # CASE 2 (Node has a single child)
-        if node_children == 1:
+        # CASE 1 and 2 (Node has no children or a single child)
+        child = node.left_child if node.left_child is not None else node.right_child
 
-            # get the single child Node
-            if node.left_child is not None:
-                child = node.left_child
-            else:
-                child = node.right_child
+        # get the parent of the Node to be deleted
+        node_parent = node.parent
 
-            if node_parent is not None:
-                # replace the Node to be deleted with its child
-                if node_parent.left_child == node:
-                    node_parent.left_child = child
-                else:
-                    node_parent.right_child = child
+        if node_parent is not None:
+            # replace the Node to be deleted with its child (or None)
+            if node_parent.left_child is node:
+                node_parent.left_child = child
             else:
-                self.root = child
+                node_parent.right_child = child
+        else:
+            self.root = child
 
+        if child is not None:
             # correct the parent pointer in Node
             child.parent = node_parent
 
-        # CASE 3 (Node has two children)
-        if node_children == 2:
-            # get the inorder successor of the deleted Node
-            successor = min_key_node(node.right_child)
+        # every Node on the path to the root now has one Node less in its subtree. the Node that got the key and
+        # values of the successor is on this path, too
+        cur_node = node_parent
+        while cur_node is not None:
+            cur_node.size -= 1
+            self._update_max_value(cur_node)
+            cur_node = cur_node.parent
 
-            # copy the inorder successor's key to the Node formerly
-            # holding the key we wished to delete
-            node.key = successor.key
+        # traverse back up the tree, fix heights and check if there are
+        # any sections which now invalidate the AVL balance rules
+        self._inspect_deletion(node_parent)
 
-            # delete the inorder successor now that it's key was
-            # copied into the other Node
-            self.delete_node(successor)
+    def search(self, key):
+        return self.find(key) is not None
 
-            # exit function so we don't call the _inspect_deletion twice
-            return
+    def _merge_sorted(self, keys, values):
+        """
+            Merge the sorted, distinct keys with their lists of values into this Tree and rebuild it.
+        """
+        merged_keys = []
+        merged_values = []
+        nodes = self.nodes()
+        node = next(nodes, None)
+        i = 0
+        while node is not None or i < len(keys):
+            if i == len(keys) or (node is not None and node.key < keys[i]):
+                merged_keys.append(node.key)
+                merged_values.append(node.values)
+                node = next(nodes, None)
+            elif node is None or keys[i] < node.key:
+                merged_keys.append(keys[i])
+                merged_values.append(values[i])
+                i += 1
+            else:
+                merged_keys.append(node.key)
+                merged_values.append(node.values + values[i])
+                node = next(nodes, None)
+                i += 1
 
-        if node_parent is not None:
-            # fix the height of the parent of current Node
-            node_parent.height = 1 + max(self.get_height(node_parent.left_child),
-                                         self.get_height(node_parent.right_child))
+        self._build_balanced(merged_keys, merged_values)
 
-            # begin to traverse back up the tree checking if there are
-            # any sections which now invalidate the AVL balance rules
-            self._inspect_deletion(node_parent)
+    def _build_balanced(self, keys, values):
+        """
+            Replace the Tree by a perfectly balanced Tree of the sorted, distinct keys in O(n). The middle key of
+            each range becomes the root of the subtree, so a subtree with m Nodes has height m.bit_length().
+        """
+        self.root = None
+        created_nodes = []
+
+        # Stapel mit Bereichen [lo, hi) der Schlüssel, deren Teilbaum noch erzeugt werden muss
+        stack = [(0, len(keys), None, False)]
+        while stack:
+            lo, hi, parent, is_left_child = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+
+            node = Node(keys[mid])
+            node.values = values[mid]
+            node.height = (hi - lo).bit_length()
+            node.size = hi - lo
+            node.parent = parent
+            created_nodes.append(node)
+            if parent is None:
+                self.root = node
+            elif is_left_child:
+                parent.left_child = node
+            else:
+                parent.right_child = node
 
-    def search(self, key):
-        if self.root is not None:
-            return self._search(key, self.root)
-        else:
-            return False
+            stack.append((lo, mid, node, True))
+            stack.append((mid + 1, hi, node, False))
 
-    def _search(self, key, cur_node):
-        if key == cur_node.key:
-            return True
-        elif key < cur_node.key and cur_node.left_child is not None:
-            return self._search(key, cur_node.left_child)
-        elif key > cur_node.key and cur_node.right_child is not None:
-            return self._search(key, cur_node.right_child)
-        return False
-
-    def _inspect_insertion(self, cur_node, path=None):
-        if path is None:
-            path = []
-        if cur_node.parent is None:
-            return
-        path = [cur_node] + path
+        # children are created after their parent, so in reverse order every Node comes after its children
+        for node in reversed(created_nodes):
+            self._update_max_value(node)
 
-        left_height = self.get_height(cur_node.parent.left_child)
-        right_height = self.get_height(cur_node.parent.right_child)
+    def _inspect_insertion(self, cur_node):
+        # walk up from the new Node. y is the child of the current parent z on the path, x the grandchild
+        y = cur_node
+        x = None
+        while y.parent is not None:
+            z = y.parent
 
-        if abs(left_height - right_height) > 1:
-            path = [cur_node.parent] + path
-            self._rebalance_node(path[0], path[1], path[2])
-            return
+            left_height = self.get_height(z.left_child)
+            right_height = self.get_height(z.right_child)
 
-        new_height = 1 + cur_node.height
-        if new_height > cur_node.parent.height:
-            cur_node.parent.height = new_height
+            if abs(left_height - right_height) > 1:
+                self._rebalance_node(z, y, x)
+                return
 
-        self._inspect_insertion(cur_node.parent, path)
+            new_height = 1 + y.height
+            if new_height <= z.height:
+                # height of z did not change, so the heights above z do not change either
+                return
+            z.height = new_height
 
-    def _inspect_deletion(self, cur_node):
-        if cur_node is None:
-            return
+            x = y
+            y = z
 
-        left_height = self.get_height(cur_node.left_child)
-        right_height = self.get_height(cur_node.right_child)
+    def _inspect_deletion(self, cur_node):
+        while cur_node is not None:
+            left_height = self.get_height(cur_node.left_child)
+            right_height = self.get_height(cur_node.right_child)
+            cur_node.height = 1 + max(left_height, right_height)
+
+            if abs(left_height - right_height) > 1:
+                y = self.taller_child(cur_node)
+                # bei gleich hohen Teilbäumen von y reicht eine einfache Rotation
+                if y is cur_node.left_child:
+                    x = y.left_child if self.get_height(y.left_child) >= self.get_height(y.right_child) \
+                        else y.right_child
+                else:
+                    x = y.right_child if self.get_height(y.right_child) >= self.get_height(y.left_child) \
+                        else y.left_child
+                self._rebalance_node(cur_node, y, x)
 
-        if abs(left_height - right_height) > 1:
-            y = self.taller_child(cur_node)
-            x = self.taller_child(y)
-            self._rebalance_node(cur_node, y, x)
+                # cur_node is now a child of the new root of this subtree
+                cur_node = cur_node.parent
 
-        self._inspect_deletion(cur_node.parent)
+            cur_node = cur_node.parent
 
     def _rebalance_node(self, z, y, x):
         if y == z.left_child and x == y.left_child:
@@ -365,6 +553,10 @@ class AVLTree:
                            self.get_height(z.right_child))
         y.height = 1 + max(self.get_height(y.left_child),
                            self.get_height(y.right_child))
+        z.size = 1 + self.get_size(z.left_child) + self.get_size(z.right_child)
+        y.size = 1 + self.get_size(y.left_child) + self.get_size(y.right_child)
+        self._update_max_value(z)
+        self._update_max_value(y)
 
     def _left_rotate(self, z):
         sub_root = z.parent
@@ -387,6 +579,10 @@ class AVLTree:
                            self.get_height(z.right_child))
         y.height = 1 + max(self.get_height(y.left_child),
                            self.get_height(y.right_child))
+        z.size = 1 + self.get_size(z.left_child) + self.get_size(z.right_child)
+        y.size = 1 + self.get_size(y.left_child) + self.get_size(y.right_child)
+        self._update_max_value(z)
+        self._update_max_value(y)
 
     @staticmethod
     def get_height(cur_node):
@@ -394,6 +590,22 @@ class AVLTree:
             return 0
         return cur_node.height
 
+    @staticmethod
+    def get_size(cur_node):
+        if cur_node is None:
+            return 0
+        return cur_node.size
+
+    @staticmethod
+    def _update_max_value(cur_node):
+        # largest first value in the subtree of cur_node, computed from the children
+        max_value = cur_node.values[0] if cur_node.values else None
+        for child in (cur_node.left_child, cur_node.right_child):
+            if child is not None and child.max_value is not None and (max_value is None or
+                                                                      child.max_value > max_value):
+                max_value = child.max_value
+        cur_node.max_value = max_value
+
     def taller_child(self, cur_node):
         left = self.get_height(cur_node.left_child)
         right = self.get_height(cur_node.right_child)
@@ -403,6 +615,7 @@ class AVLTree:
     def create_new_node(key, path_to_image):
         new_node = Node(key)
         new_node.add_value(path_to_image)
+        new_node.max_value = path_to_image
         return new_node
 
     @staticmethod
@@ -419,6 +632,8 @@ class Node:
         self.right_child = None
         self.parent = None  # pointer to parent Node in tree
         self.height = 1  # height of Node in tree (max dist. to leaf) NEW FOR AVL
+        self.size = 1  # number of Nodes in the subtree rooted at this Node
+        self.max_value = None  # largest first value of the Nodes in the subtree rooted at this Node
 
     def add_value(self, path: str):
         self.values.append(path)
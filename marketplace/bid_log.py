@@ -0,0 +1,98 @@
+# Definiert die Klasse BidLog.
+# Ein BidLog speichert alle Gebote einer Auktion in chronologischer Reihenfolge. Jedes Gebot bekommt eine
+# fortlaufende Sequenznummer (Index in der Liste _bids). Die Liste wird nur erweitert, nie verkleinert. Erhöht ein
+# User sein Gebot, wird das alte Gebot nicht gelöscht, sondern nur als überholt markiert, indem _seq_of_user auf die
+# Sequenznummer des neuen Gebots zeigt.
+
+class BidLog:
+    """
+    Append-only, chronologically ordered log of the bids of one auction
+
+    Attributes:
+        _bids (list): tuples (user_id, amount) in the order in which the bids were placed. the index of a bid is its
+        sequence number
+        _seq_of_user (dict): sequence number of the current bid of every user (key = user_id, value = sequence number)
+    """
+
+    # *** CONSTRUCTORS ***
+    def __init__(self):
+        self._bids = []
+        self._seq_of_user = {}
+
+    # *** PUBLIC methods ***
+
+    def push(self, user_id, amount):
+        """
+        Appends a new bid to the log. An older bid of the same user is superseded in O(1).
+
+        :param user_id: id of user that placed the bid
+        :param amount: amount in € of the bid
+        :return: sequence number of the new bid
+        """
+        seq = len(self._bids)
+        self._bids.append((user_id, amount))
+        self._seq_of_user[user_id] = seq
+        return seq
+
+    # *** PUBLIC GET methods ***
+
+    def peek(self):
+        """
+        Returns the last bid (user_id, amount) without removing it. The last bid is never superseded, since a newer
+        bid of the same user would have been appended after it.
+
+        :return: last bid or None, if no bid has been placed yet
+        """
+        if self.is_empty():
+            return None
+        return self._bids[-1]
+
+    def get(self, seq):
+        """
+
+        :param seq: sequence number of a bid
+        :return: bid (user_id, amount) with the given sequence number
+        """
+        return self._bids[seq]
+
+    def is_superseded(self, seq):
+        """
+
+        :param seq: sequence number of a bid
+        :return: True, if the user who placed this bid has placed a higher bid since
+        """
+        return self._seq_of_user[self._bids[seq][0]] != seq
+
+    def history(self):
+        """
+        Iterates over all bids, including superseded ones, in chronological order without copying the log.
+
+        :return: generator of tuples (seq, user_id, amount)
+        """
+        for seq in range(len(self._bids)):
+            user_id, amount = self._bids[seq]
+            yield seq, user_id, amount
+
+    def __iter__(self):
+        """
+        Iterates over the current bid of every user in the order in which these bids were placed.
+        """
+        for seq, user_id, amount in self.history():
+            if self._seq_of_user[user_id] == seq:
+                yield user_id, amount
+
+    def __len__(self):
+        return len(self._seq_of_user)
+
+    def is_empty(self):
+        return len(self._bids) == 0
+
+    def size(self):
+        return len(self)
+
+    def num_bids_total(self):
+        """
+
+        :return: number of bids in the log, including superseded ones
+        """
+        return len(self._bids)
@@ -0,0 +1,356 @@
+# Definiert die Klasse ContractionHierarchy.
+# Eine Contraction Hierarchy (CH) beschleunigt Distanzabfragen im Straßennetz durch eine einmalige Vorverarbeitung:
+# die Knoten werden nacheinander "kontrahiert", d.h. aus dem Graphen entfernt. Damit sich dabei keine kürzesten Wege
+# verlängern, wird für jeden Weg u -> v -> w, der nur über den kontrahierten Knoten v kürzeste ist, eine Abkürzung
+# (shortcut) u -> w eingefügt. Die Reihenfolge der Kontraktion ist der Rang (rank) eines Knotens: unwichtige Knoten
+# (Sackgassen, Wohnstraßen) zuerst, Autobahnkreuze zuletzt.
+# Jeder kürzeste Weg führt dann zuerst nur zu Knoten mit höherem Rang hinauf und danach nur noch hinab. Eine Abfrage
+# ist deshalb eine bidirektionale Dijkstra-Suche, die vom Start nur Kanten zu höheren Knoten (up) und vom Ziel aus nur
+# umgekehrte Kanten von höheren Knoten (down) benutzt. Beide Suchen besuchen nur wenige hundert Knoten statt einen
+# großen Teil von NRW.
+#
+# Beide Suchgraphen werden wie der RoadGraph als CSR-Arrays gespeichert:
+#     up: Kanten u -> v mit rank[v] > rank[u] stehen bei u
+#     down: Kanten u -> v mit rank[u] > rank[v] stehen umgekehrt bei v, d.h. down_indices enthält u
+# Zusätzlich wird die Signatur des RoadGraph gespeichert, aus dem die CH erzeugt wurde (s. RoadGraph.signature()).
+# load() prüft sie, damit eine alte CH nach einem neu erzeugten Straßennetz nicht mit falschen Knotenindizes benutzt
+# wird.
+# Die Vorverarbeitung in reinem Python dauert für ganz NRW lange (Stunden) und wird deshalb einmalig aus einem
+# gespeicherten RoadGraph erzeugt. Aufruf aus dem Hauptverzeichnis des Projekts:
+#     python -m marketplace.contraction_hierarchy road_graph_nrw contraction_hierarchy_nrw
+
+import heapq
+import math
+import os
+import sys
+
+import numpy as np
+
+from marketplace.road_graph import RoadGraph
+
+
+class ContractionHierarchy:
+    """
+    Contraction hierarchy of a road network for fast shortest path queries
+
+    Attributes:
+        rank (numpy.ndarray): position of every node in the contraction order (int32)
+        up_indptr, up_indices, up_lengths (numpy.ndarray): CSR arrays of the edges to nodes with a higher rank
+        down_indptr, down_indices, down_lengths (numpy.ndarray): CSR arrays of the reversed edges from nodes with a
+            higher rank
+        road_graph_signature (numpy.ndarray): signature (number of nodes, number of edges) of the road graph the
+            hierarchy was built from
+    """
+
+    # Namen der Arrays, jedes Array wird als <Name>.npy gespeichert
+    ARRAYS = ("rank", "up_indptr", "up_indices", "up_lengths", "down_indptr", "down_indices", "down_lengths",
+              "road_graph_signature")
+
+    # maximale Anzahl Knoten, die eine Zeugensuche (witness search) abschließt. ist die Suche zu kurz, werden
+    # einige überflüssige Abkürzungen eingefügt, die Ergebnisse bleiben aber korrekt
+    WITNESS_SEARCH_LIMIT = 100
+
+    # *** CONSTRUCTORS ***
+    def __init__(self, rank, up_indptr, up_indices, up_lengths, down_indptr, down_indices, down_lengths,
+                 road_graph_signature):
+        self.rank = rank
+        self.up_indptr = up_indptr
+        self.up_indices = up_indices
+        self.up_lengths = up_lengths
+        self.down_indptr = down_indptr
+        self.down_indices = down_indices
+        self.down_lengths = down_lengths
+        self.road_graph_signature = road_graph_signature
+
+    @classmethod
+    def load(cls, directory, mmap_mode='r', road_graph=None):
+        """
+        Loads a ContractionHierarchy that was saved with save(). The arrays are memory-mapped, not read.
+
+        :param directory: directory with the .npy files
+        :param mmap_mode: mmap_mode of numpy.load(), None to read the arrays into memory
+        :param road_graph: the RoadGraph that the hierarchy is used with, None to skip the check
+        :return: ContractionHierarchy
+        :raises ValueError: if the hierarchy was built from a different road graph than road_graph
+        """
+        arrays = [np.load(os.path.join(directory, name + ".npy"), mmap_mode=mmap_mode) for name in cls.ARRAYS]
+        contraction_hierarchy = cls(*arrays)
+
+        if road_graph is not None and \
+                tuple(contraction_hierarchy.road_graph_signature.tolist()) != road_graph.signature():
+            raise ValueError(f"Die Contraction Hierarchy in {directory} wurde aus einem anderen Straßennetz erzeugt")
+        return contraction_hierarchy
+
+    @classmethod
+    def build(cls, road_graph, witness_search_limit=WITNESS_SEARCH_LIMIT):
+        """
+        Contracts all nodes of the road graph. The next node is the one with the smallest priority
+        (number of shortcuts that its contraction adds - number of its edges + number of neighbors that were already
+        contracted + level in the hierarchy), so that few shortcuts are added and the contracted nodes are spread
+        evenly. Priorities are
+        updated lazily: the node taken from the heap is only contracted if its recomputed priority is still the
+        smallest one.
+
+        :param road_graph: marketplace.road_graph.RoadGraph
+        :param witness_search_limit: maximum number of nodes settled by a witness search
+        :return: ContractionHierarchy
+        """
+        num_nodes = road_graph.num_nodes()
+
+        # Kanten zwischen den noch nicht kontrahierten Knoten (out_edges[u][v] = in_edges[v][u] = Länge)
+        out_edges = [{} for _ in range(num_nodes)]
+        in_edges = [{} for _ in range(num_nodes)]
+        for u in range(num_nodes):
+            targets, lengths = road_graph.neighbors(u)
+            for v, length in zip(targets.tolist(), lengths.tolist()):
+                if v != u and length < out_edges[u].get(v, math.inf):
+                    out_edges[u][v] = length
+                    in_edges[v][u] = length
+
+        contractor = _Contractor(out_edges, in_edges, witness_search_limit)
+        rank = np.zeros(num_nodes, dtype=np.int32)
+        up_edges = []
+        down_edges = []
+
+        heap = [(contractor.priority(node), node) for node in range(num_nodes)]
+        heapq.heapify(heap)
+        next_rank = 0
+        while heap:
+            _, node = heapq.heappop(heap)
+            priority = contractor.priority(node)
+            if heap and priority > heap[0][0]:
+                heapq.heappush(heap, (priority, node))
+                continue
+
+            rank[node] = next_rank
+            next_rank += 1
+            # die übrigen Kanten von node führen alle zu Knoten, die später kontrahiert werden (höherer Rang)
+            up_edges.extend((node, v, length) for v, length in out_edges[node].items())
+            down_edges.extend((node, u, length) for u, length in in_edges[node].items())
+            contractor.contract(node)
+
+        up_indptr, up_indices, up_lengths = ContractionHierarchy._to_csr(num_nodes, up_edges)
+        down_indptr, down_indices, down_lengths = ContractionHierarchy._to_csr(num_nodes, down_edges)
+        return cls(rank, up_indptr, up_indices, up_lengths, down_indptr, down_indices, down_lengths,
+                   np.array(road_graph.signature(), dtype=np.int64))
+
+    # *** PUBLIC methods ***
+
+    def save(self, directory):
+        """
+        Saves all arrays as .npy files in the given directory, which is created if necessary.
+        """
+        os.makedirs(directory, exist_ok=True)
+        for name in self.ARRAYS:
+            np.save(os.path.join(directory, name + ".npy"), np.ascontiguousarray(getattr(self, name)))
+
+    # *** PUBLIC GET methods ***
+
+    def num_nodes(self):
+        return len(self.rank)
+
+    def num_edges(self):
+        return len(self.up_indices) + len(self.down_indices)
+
+    def shortest_path_length(self, source, target):
+        """
+        Computes the length of the shortest path from source to target with a bidirectional search on the up and
+        down edges.
+
+        :param source: index of the start node
+        :param target: index of the destination node
+        :return: length in meters, float('inf') if target cannot be reached
+        """
+        return self.distances_from(source, [target])[target]
+
+    def distances_from(self, source, targets, cutoff=math.inf):
+        """
+        Computes the lengths of the shortest paths from source to all targets. The upward search from source is done
+        only once, then for every target an upward search on the down edges is done, which stops as soon as it
+        cannot find a shorter path through a node of the search from source.
+
+        :param source: index of the start node
+        :param targets: indices of the destination nodes
+        :param cutoff: maximum length in meters, targets that are farther away get float('inf')
+        :return: dictionary target -> length in meters, float('inf') if the target cannot be reached within cutoff
+        """
+        lengths = {int(target): math.inf for target in targets}
+        if not lengths:
+            return lengths
+
+        forward = self._upward_search(source, self.up_indptr, self.up_indices, self.up_lengths, cutoff)
+        for target in lengths:
+            length = self._backward_search(target, forward, cutoff)
+            lengths[target] = length if length <= cutoff else math.inf
+        return lengths
+
+    # *** PUBLIC STATIC methods ***
+
+    @staticmethod
+    def exists(directory):
+        return all(os.path.isfile(os.path.join(directory, name + ".npy")) for name in ContractionHierarchy.ARRAYS)
+
+    # *** PRIVATE methods ***
+
+    @staticmethod
+    def _upward_search(source, indptr, indices, lengths, cutoff):
+        """
+        Dijkstra's algorithm on the up edges from source, the search space is small because every edge leads to a
+        node with a higher rank.
+
+        :return: dictionary node -> length of the shortest upward path from source
+        """
+        distances = {source: 0.0}
+        heap = [(0.0, source)]
+        settled = set()
+        while heap:
+            distance, node = heapq.heappop(heap)
+            if node in settled:
+                continue
+            settled.add(node)
+
+            start, end = int(indptr[node]), int(indptr[node + 1])
+            for neighbor, length in zip(indices[start:end].tolist(), lengths[start:end].tolist()):
+                new_distance = distance + length
+                if new_distance <= cutoff and new_distance < distances.get(neighbor, math.inf):
+                    distances[neighbor] = new_distance
+                    heapq.heappush(heap, (new_distance, neighbor))
+        return distances
+
+    def _backward_search(self, target, forward, cutoff):
+        """
+        Dijkstra's algorithm on the down edges from target. Every node settled by both searches is a candidate for
+        the highest node of the shortest path. The search stops when the next node is farther away than the best
+        path found so far.
+
+        :param forward: result of _upward_search from the source
+        :return: length of the shortest path, float('inf') if there is none within cutoff
+        """
+        best = forward.get(target, math.inf)
+        distances = {target: 0.0}
+        heap = [(0.0, target)]
+        settled = set()
+        while heap:
+            distance, node = heapq.heappop(heap)
+            if distance >= best:
+                break
+            if node in settled:
+                continue
+            settled.add(node)
+
+            if node in forward:
+                best = min(best, forward[node] + distance)
+
+            start, end = int(self.down_indptr[node]), int(self.down_indptr[node + 1])
+            for neighbor, length in zip(self.down_indices[start:end].tolist(),
+                                        self.down_lengths[start:end].tolist()):
+                new_distance = distance + length
+                if new_distance <= cutoff and new_distance < distances.get(neighbor, math.inf):
+                    distances[neighbor] = new_distance
+                    heapq.heappush(heap, (new_distance, neighbor))
+        return best
+
+    @staticmethod
+    def _to_csr(num_nodes, edges):
+        # edges: Liste von Tupeln (Knoten, an dem die Kante gespeichert wird, anderer Knoten, Länge)
+        edges.sort()
+        sources = np.array([u for u, _, _ in edges], dtype=np.int64)
+        indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=num_nodes), out=indptr[1:])
+        indices = np.array([v for _, v, _ in edges], dtype=np.int32)
+        lengths = np.array([length for _, _, length in edges], dtype=np.float32)
+        return indptr, indices, lengths
+
+
+class _Contractor:
+    """
+    Graph of the nodes that are not contracted yet, used by ContractionHierarchy.build()
+
+    Attributes:
+        _out_edges (list): dictionary v -> length of the edges leaving every node
+        _in_edges (list): dictionary u -> length of the edges entering every node
+        _num_contracted_neighbors (list): number of neighbors of every node that were already contracted
+        _level (list): 1 + highest level of the contracted neighbors of every node, 0 if there are none
+        _witness_search_limit (int): maximum number of nodes settled by a witness search
+    """
+
+    def __init__(self, out_edges, in_edges, witness_search_limit):
+        self._out_edges = out_edges
+        self._in_edges = in_edges
+        self._num_contracted_neighbors = [0] * len(out_edges)
+        self._level = [0] * len(out_edges)
+        self._witness_search_limit = witness_search_limit
+
+    def priority(self, node):
+        num_shortcuts = len(self._shortcuts(node))
+        num_edges = len(self._out_edges[node]) + len(self._in_edges[node])
+        return num_shortcuts - num_edges + self._num_contracted_neighbors[node] + self._level[node]
+
+    def contract(self, node):
+        """
+        Adds the shortcuts that are needed without node and removes node from the graph.
+        """
+        for u, w, length in self._shortcuts(node):
+            if length < self._out_edges[u].get(w, math.inf):
+                self._out_edges[u][w] = length
+                self._in_edges[w][u] = length
+
+        for v in self._out_edges[node]:
+            del self._in_edges[v][node]
+            self._num_contracted_neighbors[v] += 1
+            self._level[v] = max(self._level[v], self._level[node] + 1)
+        for u in self._in_edges[node]:
+            del self._out_edges[u][node]
+            self._num_contracted_neighbors[u] += 1
+            self._level[u] = max(self._level[u], self._level[node] + 1)
+
+    def _shortcuts(self, node):
+        """
+        Returns the shortcuts u -> w for all paths u -> node -> w for which a witness search does not find a path of
+        at most the same length that avoids node.
+
+        :return: list of tuples (u, w, length)
+        """
+        shortcuts = []
+        out_edges = self._out_edges[node]
+        if not out_edges:
+            return shortcuts
+
+        max_out_length = max(out_edges.values())
+        for u, in_length in self._in_edges[node].items():
+            distances = self._witness_search(u, node, in_length + max_out_length)
+            for w, out_length in out_edges.items():
+                if w != u and distances.get(w, math.inf) > in_length + out_length:
+                    shortcuts.append((u, w, in_length + out_length))
+        return shortcuts
+
+    def _witness_search(self, source, excluded, max_distance):
+        # Dijkstra von source ohne den Knoten excluded, bis max_distance oder bis das Limit erreicht ist
+        distances = {source: 0.0}
+        heap = [(0.0, source)]
+        num_settled = 0
+        while heap and num_settled < self._witness_search_limit:
+            distance, node = heapq.heappop(heap)
+            if distance > max_distance:
+                break
+            if distance > distances[node]:
+                continue
+            num_settled += 1
+
+            for neighbor, length in self._out_edges[node].items():
+                new_distance = distance + length
+                if neighbor != excluded and new_distance < distances.get(neighbor, math.inf):
+                    distances[neighbor] = new_distance
+                    heapq.heappush(heap, (new_distance, neighbor))
+        return distances
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Aufruf: python -m marketplace.contraction_hierarchy <Verzeichnis des RoadGraph> <Zielverzeichnis>")
+        sys.exit(1)
+
+    contraction_hierarchy = ContractionHierarchy.build(RoadGraph.load(sys.argv[1], mmap_mode=None))
+    contraction_hierarchy.save(sys.argv[2])
+    print(f"{contraction_hierarchy.num_nodes()} Knoten und {contraction_hierarchy.num_edges()} Kanten "
+          f"in {sys.argv[2]} gespeichert")
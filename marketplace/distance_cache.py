@@ -0,0 +1,133 @@
+# Definiert die Klasse DistanceCache.
+# Ein DistanceCache speichert Fahrstrecken zwischen zwei Knoten des Straßennetzes. Der Schlüssel ist das Paar der
+# Knotenindizes in sortierter Reihenfolge (min, max), d.h. die Distanz von a nach b wird auch für die Abfrage von b
+# nach a benutzt. Das ist eine Näherung, weil Einbahnstraßen die beiden Richtungen verschieden lang machen können,
+# für Empfehlungen im Umkreis aber genau genug.
+# Im Speicher werden höchstens max_entries Distanzen gehalten, bei mehr wird die am längsten nicht benutzte entfernt
+# (LRU, least recently used). Zusätzlich werden alle Distanzen in einer SQLite-Datenbank gespeichert, damit sie nach
+# einem Neustart nicht neu berechnet werden müssen. Die Datenbank merkt sich die Signatur des Straßennetzes; passt
+# sie nicht mehr, z.B. weil das Straßennetz neu erzeugt wurde, werden die gespeicherten Distanzen gelöscht.
+
+import sqlite3
+from collections import OrderedDict
+
+
+class DistanceCache:
+    """
+    Size-bounded LRU cache of road distances between pairs of nodes, optionally persisted in SQLite
+
+    Attributes:
+        _max_entries (int): maximum number of distances kept in memory
+        _entries (OrderedDict): distance of every pair (node_a, node_b) with node_a <= node_b, least recently used
+            pair first
+        _connection (sqlite3.Connection): connection to the database file or None
+        _num_uncommitted (int): number of distances written to the database since the last commit
+    """
+
+    # Anzahl der Distanzen, die standardmäßig im Speicher gehalten werden
+    MAX_ENTRIES = 100000
+    # nach so vielen neuen Distanzen werden sie in die Datenbank geschrieben
+    COMMIT_INTERVAL = 1000
+
+    # *** CONSTRUCTORS ***
+    def __init__(self, database_file=None, signature="", max_entries=MAX_ENTRIES):
+        """
+
+        :param database_file: path of the SQLite database, None to keep the distances only in memory
+        :param signature: identifies the road network the node indices belong to, e.g. its number of nodes and edges
+        :param max_entries: maximum number of distances kept in memory
+        """
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        self._connection = None
+        self._num_uncommitted = 0
+
+        if database_file is not None:
+            self._connection = sqlite3.connect(database_file)
+            self._create_tables(signature)
+
+    # *** PUBLIC methods ***
+
+    def put(self, node_a, node_b, distance):
+        """
+        Stores the distance between two nodes in memory and in the database. The least recently used distance is
+        removed from memory if there are more than max_entries.
+        """
+        key = DistanceCache._key(node_a, node_b)
+        self._remember(key, distance)
+
+        if self._connection is not None:
+            self._connection.execute("INSERT OR REPLACE INTO distances (node_a, node_b, distance) VALUES (?, ?, ?)",
+                                     (key[0], key[1], distance))
+            self._num_uncommitted += 1
+            if self._num_uncommitted >= self.COMMIT_INTERVAL:
+                self.flush()
+
+    def flush(self):
+        """
+        Commits the distances that were not written to the database file yet.
+        """
+        if self._connection is not None and self._num_uncommitted > 0:
+            self._connection.commit()
+            self._num_uncommitted = 0
+
+    def close(self):
+        self.flush()
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    # *** PUBLIC GET methods ***
+
+    def get(self, node_a, node_b):
+        """
+        Returns the distance between two nodes, from memory or else from the database. The pair becomes the most
+        recently used one.
+
+        :return: distance in meters or None, if it is not known
+        """
+        key = DistanceCache._key(node_a, node_b)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        if self._connection is None:
+            return None
+        row = self._connection.execute("SELECT distance FROM distances WHERE node_a = ? AND node_b = ?",
+                                       key).fetchone()
+        if row is None:
+            return None
+        self._remember(key, row[0])
+        return row[0]
+
+    def __len__(self):
+        """
+        Returns the number of distances in memory.
+        """
+        return len(self._entries)
+
+    # *** PRIVATE methods ***
+
+    def _remember(self, key, distance):
+        self._entries[key] = distance
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def _create_tables(self, signature):
+        self._connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS distances (node_a INTEGER, node_b INTEGER, "
+                                 "distance REAL, PRIMARY KEY (node_a, node_b)) WITHOUT ROWID")
+
+        # die Knotenindizes gehören zu einem anderen Straßennetz: gespeicherte Distanzen sind ungültig
+        row = self._connection.execute("SELECT value FROM meta WHERE key = 'signature'").fetchone()
+        if row is None or row[0] != signature:
+            self._connection.execute("DELETE FROM distances")
+            self._connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('signature', ?)",
+                                     (signature,))
+        self._connection.commit()
+
+    @staticmethod
+    def _key(node_a, node_b):
+        node_a, node_b = int(node_a), int(node_b)
+        return (node_a, node_b) if node_a <= node_b else (node_b, node_a)
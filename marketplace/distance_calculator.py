@@ -1,15 +1,77 @@
-import osmnx as ox
+import os
+from typing import Tuple, Dict, List, Iterable
 
-from typing import Tuple, Dict, List
+from marketplace.contraction_hierarchy import ContractionHierarchy
+from marketplace.distance_cache import DistanceCache
+from marketplace.grid_index import GridIndex
+from marketplace.road_graph import RoadGraph
 
 
 class DistanceCalculator:
-    def __init__(self):
-        # Cache für bereits berechnete Distanzen
-        self._distance_cache = {}
-        # Graph für ganz NRW laden und cachen
-        self._map_graph = ox.graph.graph_from_place('North Rhine-Westphalia, Germany',
-                                                    network_type='drive')
+    # Verzeichnis mit dem vorverarbeiteten Straßennetz (s. marketplace/road_graph.py) und Gebiet, aus dem es erzeugt
+    # wird, falls es noch nicht existiert
+    ROAD_GRAPH_DIRECTORY = "road_graph_nrw"
+    ROAD_GRAPH_PLACE = 'North Rhine-Westphalia, Germany'
+    # Verzeichnis mit der optionalen Contraction Hierarchy des Straßennetzes (s. marketplace/contraction_hierarchy.py)
+    CONTRACTION_HIERARCHY_DIRECTORY = "contraction_hierarchy_nrw"
+    # Datenbank mit den bereits berechneten Distanzen, im Verzeichnis des Straßennetzes
+    DISTANCE_CACHE_FILE = "distance_cache.sqlite"
+
+    def __init__(self, road_graph_directory=ROAD_GRAPH_DIRECTORY,
+                 contraction_hierarchy_directory=CONTRACTION_HIERARCHY_DIRECTORY):
+        # Graph für ganz NRW von der Festplatte laden (memory-mapped). nur beim allerersten Start wird er einmalig
+        # mit osmnx heruntergeladen und gespeichert
+        if not RoadGraph.exists(road_graph_directory):
+            print(f"Straßennetz nicht in {road_graph_directory} gefunden, es wird einmalig heruntergeladen...")
+            RoadGraph.build(self.ROAD_GRAPH_PLACE).save(road_graph_directory)
+        self._road_graph = RoadGraph.load(road_graph_directory)
+        # kürzeste Wege werden mit der Contraction Hierarchy berechnet, falls sie vorher mit
+        # python -m marketplace.contraction_hierarchy erzeugt wurde, sonst mit Dijkstra auf dem Straßennetz. beide
+        # bieten shortest_path_length() und distances_from() an. die Contraction Hierarchy wird ganz in den Speicher
+        # gelesen, weil jede Abfrage nur wenige Knoten besucht und der Zugriff auf memory-mapped Arrays pro Knoten
+        # teurer ist als die Suche selbst. wurde sie aus einem anderen Straßennetz erzeugt, passen die Knotenindizes
+        # nicht und es wird ebenfalls Dijkstra benutzt
+        self._shortest_paths = self._road_graph
+        if ContractionHierarchy.exists(contraction_hierarchy_directory):
+            try:
+                self._shortest_paths = ContractionHierarchy.load(contraction_hierarchy_directory, mmap_mode=None,
+                                                                 road_graph=self._road_graph)
+            except ValueError as e:
+                print(f"{e}, sie wird nicht benutzt. Bitte mit python -m marketplace.contraction_hierarchy neu "
+                      f"erzeugen.")
+        # Cache für bereits berechnete Distanzen zwischen Knoten, bleibt über Neustarts hinweg erhalten
+        self._distance_cache = DistanceCache(os.path.join(road_graph_directory, self.DISTANCE_CACHE_FILE),
+                                             signature="_".join(map(str, self._road_graph.signature())))
+        # Gitter über die Knoten des Straßennetzes, wird erst bei der ersten Abfrage erzeugt
+        self._grid_index = None
+        # nächster Knoten jedes Nutzers (key = user_id, value = (gps_coords, Knoten)). der Eintrag gilt nur, solange
+        # sich die gps_coords des Nutzers nicht ändern
+        self._node_of_user = {}
+
+    def snap_users(self, users) -> None:
+        """
+        Bestimmt den nächsten Knoten im Straßennetz für alle Nutzer, deren Knoten noch nicht bekannt ist oder deren
+        Koordinaten sich geändert haben, mit einem einzigen Aufruf von GridIndex.snap_many()
+
+        Args:
+            users: Nutzer (marketplace.user.User), z.B. users.values()
+        """
+        stale_users = [user for user in users if not self._is_snapped(user)]
+        if not stale_users:
+            return
+
+        nodes = self._get_grid_index().snap_many([user.gps_coords() for user in stale_users])
+        for user, node in zip(stale_users, nodes):
+            self._node_of_user[user.id()] = (user.gps_coords(), node)
+
+    def get_node_of_user(self, user) -> int:
+        """
+        Gibt den nächsten Knoten im Straßennetz zum Wohnort des Nutzers zurück, aus dem Cache, falls sich die
+        Koordinaten des Nutzers seit dem letzten Aufruf nicht geändert haben
+        """
+        if not self._is_snapped(user):
+            self.snap_users([user])
+        return self._node_of_user[user.id()][1]
 
     def calculate_distance(self, origin_coords: Tuple[float, float],
                            dest_coords: Tuple[float, float]) -> float:
@@ -23,34 +85,13 @@ class DistanceCalculator:
         Returns:
             Distanz in Metern
         """
-        # Cache-Key erstellen
-        cache_key = f"{origin_coords}_{dest_coords}"
-
-        # Wenn Distanz bereits berechnet wurde, aus Cache zurückgeben
-        if cache_key in self._distance_cache:
-            return self._distance_cache[cache_key]
-
         try:
             # Nächste Knoten im Graph finden
-            origin = ox.distance.nearest_nodes(self._map_graph,
-                                               origin_coords[1],
-                                               origin_coords[0])
-            destination = ox.distance.nearest_nodes(self._map_graph,
-                                                    dest_coords[1],
-                                                    dest_coords[0])
-
-            # Kürzesten Pfad berechnen
-            shortest_path = ox.distance.shortest_path(self._map_graph,
-                                                      origin,
-                                                      destination,
-                                                      weight='length')
-
-            # Gesamtdistanz des Pfads berechnen
-            total_distance = sum(self._map_graph[path[0]][path[1]][0]['length']
-                                 for path in zip(shortest_path[:-1], shortest_path[1:]))
-
-            # Distanz im Cache speichern
-            self._distance_cache[cache_key] = total_distance
+            origin, destination = self._get_grid_index().snap_many([origin_coords, dest_coords])
+
+            # Länge des kürzesten Pfads berechnen, wenn sie noch nicht im Cache ist
+            total_distance = self.calculate_node_distance(origin, destination)
+            self._distance_cache.flush()
 
             return total_distance
 
@@ -58,6 +99,55 @@ class DistanceCalculator:
             print(f"Fehler bei der Distanzberechnung: {e}")
             return float('inf')  # Unendlich zurückgeben bei Fehler
 
+    def calculate_node_distance(self, origin: int, destination: int) -> float:
+        """
+        Berechnet die Fahrstrecke zwischen zwei Knoten des Straßennetzes
+
+        Args:
+            origin: Index des Startknotens
+            destination: Index des Zielknotens
+
+        Returns:
+            Distanz in Metern
+        """
+        distance = self._distance_cache.get(origin, destination)
+        if distance is None:
+            distance = self._shortest_paths.shortest_path_length(origin, destination)
+            self._distance_cache.put(origin, destination, distance)
+        return distance
+
+    def distances_from(self, origin: int, targets: Iterable[int], cutoff: float = float('inf')) -> Dict[int, float]:
+        """
+        Berechnet die Fahrstrecken von einem Knoten zu mehreren Zielknoten mit einer einzigen Dijkstra-Suche, die
+        endet, sobald alle Ziele erreicht sind oder die Distanz cutoff überschritten wird. Bereits berechnete
+        Distanzen werden aus dem Cache genommen.
+
+        Args:
+            origin: Index des Startknotens
+            targets: Indizes der Zielknoten
+            cutoff: Maximale Distanz in Metern
+
+        Returns:
+            Dictionary Zielknoten -> Distanz in Metern, unendlich für Ziele, die weiter als cutoff entfernt sind
+        """
+        distances = {}
+        open_targets = []
+        for target in targets:
+            distance = self._distance_cache.get(origin, target)
+            if distance is not None:
+                distances[target] = distance if distance <= cutoff else float('inf')
+            else:
+                open_targets.append(target)
+
+        for target, distance in self._shortest_paths.distances_from(origin, open_targets, cutoff).items():
+            distances[target] = distance
+            # Ziele hinter cutoff wurden nicht zu Ende gesucht, ihre Distanz ist unbekannt
+            if distance <= cutoff:
+                self._distance_cache.put(origin, target, distance)
+        self._distance_cache.flush()
+
+        return distances
+
     def find_nearby_friends_of_friends(self, user_id: str, users: Dict, max_distance: float = 50000) -> List[str]:
         """
         Findet Freunde von Freunden innerhalb einer bestimmten Distanz
@@ -71,12 +161,14 @@ class DistanceCalculator:
             Liste von Nutzer-IDs der nahegelegenen Freunde von Freunden
         """
         user = users[user_id]
-        user_coords = user.get_coordinates()
+        # alle Nutzer einmalig auf Knoten des Straßennetzes abbilden, danach kommen die Knoten aus dem Cache
+        self.snap_users(users.values())
+        user_node = self.get_node_of_user(user)
 
         # Set für besuchte Nutzer
         visited = {user_id}
-        # Liste für Empfehlungen
-        recommendations = []
+        # Kandidaten für Empfehlungen (key = user_id, value = Knoten des Nutzers)
+        candidates = {}
 
         # Freunde der Freunde finden (2 Ebenen tief)
         queue = [(friend_id, 1) for friend_id in user.friends()]
@@ -90,12 +182,9 @@ class DistanceCalculator:
             visited.add(current_id)
             current_user = users[current_id]
 
-            # Distanz zum aktuellen Nutzer berechnen
-            distance = self.calculate_distance(user_coords, current_user.get_coordinates())
-
-            # Wenn Nutzer nah genug ist und nicht direkt befreundet, als Empfehlung hinzufügen
-            if distance <= max_distance and current_id not in user.friends():
-                recommendations.append((current_id, distance))
+            # Wenn Nutzer nicht direkt befreundet ist, ist er ein Kandidat
+            if current_id not in user.friends():
+                candidates[current_id] = self.get_node_of_user(current_user)
 
             # Wenn wir noch nicht zu tief sind, Freunde des aktuellen Nutzers zur Queue hinzufügen
             if depth < 2:
@@ -103,5 +192,21 @@ class DistanceCalculator:
                     if friend_id not in visited:
                         queue.append((friend_id, depth + 1))
 
-        # Nach Distanz sortieren und nur IDs zurückgeben
-        return [rec[0] for rec in sorted(recommendations, key=lambda x: x[1])]
\ No newline at end of file
+        # Distanzen zu allen Kandidaten mit einer einzigen Suche berechnen, die bei max_distance abbricht
+        distances = self.distances_from(user_node, set(candidates.values()), cutoff=max_distance)
+
+        # nur Kandidaten, die nah genug sind, nach Distanz sortieren und nur IDs zurückgeben
+        recommendations = [(candidate_id, distances[node]) for candidate_id, node in candidates.items()
+                           if distances[node] <= max_distance]
+        return [rec[0] for rec in sorted(recommendations, key=lambda x: x[1])]
+
+    # *** PRIVATE methods ***
+
+    def _get_grid_index(self) -> GridIndex:
+        if self._grid_index is None:
+            self._grid_index = GridIndex(self._road_graph.lat, self._road_graph.lon)
+        return self._grid_index
+
+    def _is_snapped(self, user) -> bool:
+        snapped = self._node_of_user.get(user.id())
+        return snapped is not None and snapped[0] == user.gps_coords()
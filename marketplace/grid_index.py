@@ -0,0 +1,157 @@
+# Definiert die Klasse GridIndex.
+# Ein GridIndex teilt die Ebene in gleich große quadratische Zellen und speichert für jede Zelle die Knoten des
+# Straßennetzes, die darin liegen. Für den nächsten Knoten zu einer Koordinate müssen dann nur die Zellen in der Nähe
+# durchsucht werden, Ring für Ring um die Zelle der Koordinate, statt alle Knoten.
+# Die Koordinaten werden wie in RoadGraph.nearest_node() auf eine Ebene projiziert: x = lon * cos(lat0), y = lat.
+# Die Zellen werden wie ein CSR-Array gespeichert: die Knoten der Zelle c stehen in
+# order[cell_start[c]:cell_start[c + 1]].
+
+import math
+
+import numpy as np
+
+
+class GridIndex:
+    """
+    Uniform grid over the nodes of a road graph for nearest-node queries
+
+    Attributes:
+        _x (numpy.ndarray): projected x coordinate of every node
+        _y (numpy.ndarray): projected y coordinate (latitude) of every node
+        _cos_lat0 (float): cosine of the reference latitude of the projection
+        _cell_size (float): side length of a cell in (projected) degrees
+        _x0, _y0 (float): lower left corner of the grid
+        _num_cells_x, _num_cells_y (int): number of cells in x and y direction
+        _order (numpy.ndarray): node indices sorted by cell
+        _cell_start (numpy.ndarray): nodes of cell c are _order[_cell_start[c]:_cell_start[c + 1]]
+    """
+
+    # Kantenlänge einer Zelle in Grad (0.01 Grad Breite sind etwa 1.1 km)
+    CELL_SIZE = 0.01
+
+    # *** CONSTRUCTORS ***
+    def __init__(self, lat, lon, cell_size=CELL_SIZE):
+        """
+        Sorts the nodes into the cells of the grid in O(n log n).
+
+        :param lat: latitude of every node
+        :param lon: longitude of every node
+        :param cell_size: side length of a cell in degrees
+        """
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+
+        self._cos_lat0 = math.cos(math.radians(float(lat.mean()))) if len(lat) else 1.0
+        self._cell_size = cell_size
+        self._x = lon * self._cos_lat0
+        self._y = lat
+
+        self._x0 = float(self._x.min()) if len(lat) else 0.0
+        self._y0 = float(self._y.min()) if len(lat) else 0.0
+        self._num_cells_x = int((float(self._x.max()) - self._x0) // cell_size) + 1 if len(lat) else 1
+        self._num_cells_y = int((float(self._y.max()) - self._y0) // cell_size) + 1 if len(lat) else 1
+
+        cells = self._cells_of(self._x, self._y)
+        self._order = np.argsort(cells, kind='stable')
+        self._cell_start = np.zeros(self._num_cells_x * self._num_cells_y + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cells, minlength=self._num_cells_x * self._num_cells_y), out=self._cell_start[1:])
+
+    # *** PUBLIC GET methods ***
+
+    def nearest(self, lat, lon):
+        """
+        Returns the node closest to the given coordinates. The cells are searched in rings around the cell of the
+        coordinates. After ring r every node that has not been looked at is at least r cells away, so the search
+        stops as soon as the best node found is closer than that.
+
+        :return: index of the nearest node, None if the grid is empty
+        """
+        return self.snap_many([(lat, lon)])[0]
+
+    def snap_many(self, coords):
+        """
+        Returns the nearest node for each of the given coordinates. All coordinates are searched at the same time:
+        for ring 0, 1, 2, ... the nodes of the ring cells of every coordinate that is not finished yet are gathered
+        into one array, their distances are computed with numpy and the nearest candidate of every coordinate is
+        kept. A coordinate is finished as soon as its nearest node is closer than any cell outside of the rings
+        searched so far.
+
+        :param coords: sequence of tuples (lat, lon)
+        :return: list with the index of the nearest node for every coordinate (None if the grid is empty)
+        """
+        if len(self._order) == 0:
+            return [None] * len(coords)
+
+        coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        xs = coords[:, 1] * self._cos_lat0
+        ys = coords[:, 0]
+        cells_x = np.clip(((xs - self._x0) // self._cell_size).astype(np.int64), 0, self._num_cells_x - 1)
+        cells_y = np.clip(((ys - self._y0) // self._cell_size).astype(np.int64), 0, self._num_cells_y - 1)
+
+        best_nodes = np.full(len(coords), -1, dtype=np.int64)
+        best_distances = np.full(len(coords), np.inf)
+        active = np.arange(len(coords))
+        for ring in range(max(self._num_cells_x, self._num_cells_y) + 1):
+            # Zellen des Rings um die Zelle jeder noch aktiven Koordinate (eine Zeile pro Koordinate)
+            offsets = GridIndex._ring_offsets(ring)
+            ring_x = cells_x[active][:, None] + offsets[:, 0]
+            ring_y = cells_y[active][:, None] + offsets[:, 1]
+            inside = (ring_x >= 0) & (ring_x < self._num_cells_x) & (ring_y >= 0) & (ring_y < self._num_cells_y)
+            points = np.broadcast_to(active[:, None], ring_x.shape)[inside]
+            cells = ring_x[inside] * self._num_cells_y + ring_y[inside]
+
+            # Knoten aller dieser Zellen: Zelle c liefert die Positionen cell_start[c] bis cell_start[c + 1] - 1
+            starts = self._cell_start[cells]
+            counts = self._cell_start[cells + 1] - starts
+            num_candidates = int(counts.sum())
+            if num_candidates:
+                candidate_points = np.repeat(points, counts)
+                positions = np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(num_candidates)
+                candidates = self._order[positions]
+                dx = self._x[candidates] - xs[candidate_points]
+                dy = self._y[candidates] - ys[candidate_points]
+                GridIndex._keep_nearest(candidate_points, candidates, dx * dx + dy * dy, best_nodes, best_distances)
+
+            # alle Knoten außerhalb der Ringe 0 bis ring sind mindestens ring Zellen entfernt, auch wenn die Koordinate
+            # außerhalb des Gitters liegt und auf die nächste Zelle am Rand geschoben wurde
+            active = active[best_distances[active] > (ring * self._cell_size) ** 2]
+            if len(active) == 0:
+                break
+
+        return best_nodes.tolist()
+
+    # *** PRIVATE methods ***
+
+    def _cells_of(self, x, y):
+        cells_x = ((x - self._x0) // self._cell_size).astype(np.int64)
+        cells_y = ((y - self._y0) // self._cell_size).astype(np.int64)
+        return cells_x * self._num_cells_y + cells_y
+
+    @staticmethod
+    def _ring_offsets(ring):
+        # (dx, dy) aller Zellen mit Chebyshev-Abstand ring zur Zelle (0, 0)
+        steps = np.arange(-ring, ring + 1)
+        dx, dy = np.meshgrid(steps, steps, indexing='ij')
+        on_ring = np.maximum(np.abs(dx), np.abs(dy)) == ring
+        return np.stack((dx[on_ring], dy[on_ring]), axis=1)
+
+    @staticmethod
+    def _keep_nearest(points, candidates, distances, best_nodes, best_distances):
+        """
+        Updates best_nodes and best_distances with the nearest candidate of every point.
+
+        :param points: index of the coordinate of every candidate
+        :param candidates: node index of every candidate
+        :param distances: squared distance of every candidate to its coordinate
+        """
+        # nach Koordinate und Abstand sortieren, der erste Kandidat jeder Koordinate ist der nächste
+        order = np.lexsort((distances, points))
+        points = points[order]
+        first = np.ones(len(points), dtype=bool)
+        first[1:] = points[1:] != points[:-1]
+        points = points[first]
+        nearest = order[first]
+
+        closer = distances[nearest] < best_distances[points]
+        best_nodes[points[closer]] = candidates[nearest[closer]]
+        best_distances[points[closer]] = distances[nearest[closer]]
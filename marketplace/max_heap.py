@@ -1,9 +1,9 @@
 # Die Klasse MaxHeap implementiert einen Max-Heap
+# Neben Auktionen (sortiert nach Anzahl der Bieter) werden darin auch User (sortiert nach mittlerer Bewertung)
+# gespeichert, dann ist auction_id die user_id und bid_count die mittlere Anzahl Sterne.
 import heapq
 
 
-# TODO: Diese Klasse implementieren Sie in Praktikum 2
-
 class MaxHeap:
     def __init__(self):
         """ Initialisierung des Max-Heaps.
@@ -12,101 +12,139 @@ class MaxHeap:
 
         heap: Eine Liste zur Speicherung des Heaps, bestehend aus Tupeln in der Form (bid_count, auction_id).
         auction_map: Eine Hash-Map, welche die Position der Auktionen im Max-Heap speichert.
-                     (key = auction_id, value = (bid_count, heap_index))
+                     (key = auction_id, value = heap_index)
         """
         self.heap = []
         self.auction_map = {}
 
-        # TODO: wenn Sie die anderen Methoden implementiert haben, können Sie diese Zeile auskommentieren
-        #raise NotImplementedError
-
     # *** PUBLIC methods ***
 
     def add_auction(self, auction_id, bid_count):
-        """ Fügt eine neue Auktion zum Max-Heap hinzu.
-            Wenn die Auktion schon im heap ist, wird die Auktion nicht hinzugefügt.
+        """ Fügt eine neue Auktion zum Max-Heap hinzu. Laufzeit O(log n).
 
         Args:
             auction_id: Die ID-Nummer der Auktion.
             bid_count: Die Anzahl der Bieter für diese Auktion.
+
+        Raises:
+            ValueError: Wenn die Auktion schon im Heap ist.
         """
         if auction_id in self.auction_map:
             raise ValueError("Auktion existiert bereits")
-        #geändert
-        # Auktion wird zum Heap hinzugefügt
-        # negatives Vorzeichen kehrt die Reihenfolge der Elemente um, sodass das größte Gebot (die Auktion mit den meisten Bietern) immer an der Spitze des Heaps steht
-        heapq.heappush(self.heap, (-bid_count, auction_id))
 
-        # Der Index des letzten Elements im Heap ist immer len(self.heap) - 1, da die Indizierung bei 0 beginnt
-        # Die Position wird als len(self.heap) - 1 in der Hash-Map gespeichert
-        self.auction_map[auction_id] = (bid_count, len(self.heap)-1)
+        # Auktion wird am Ende des Heaps eingefügt und dann nach oben verschoben
+        self.heap.append((bid_count, auction_id))
+        self.auction_map[auction_id] = len(self.heap) - 1
+        self._heapify_up(len(self.heap) - 1)
 
     def update_bidders(self, auction_id, new_bid_count):
-        """ Aktualisiert die Anzahl der Bieter für eine Auktion.
-            Wenn die Auktion nicht im Heap ist, wird keine Auktion geändert.
+        """ Aktualisiert die Anzahl der Bieter für eine Auktion (increase- bzw. decrease-key). Laufzeit O(log n).
 
         Args:
             auction_id: Die ID-Nummer der Auktion.
             new_bid_count: Die neue Anzahl der Bieter für diese Auktion.
+
+        Raises:
+            ValueError: Wenn die Auktion nicht im Heap ist.
         """
         if auction_id not in self.auction_map:
             raise ValueError("Auktion existiert nicht")
-        """ Geändert
-            Die alte Anzahl der Bieter und Index"""
-        old_bid_count, index = self.auction_map[auction_id]
 
-        # Entfernt das alte Tupel und fügt das neue hinzu
+        index = self.auction_map[auction_id]
+        old_bid_count = self.heap[index][0]
         self.heap[index] = (new_bid_count, auction_id)
-        self.auction_map[auction_id] = (new_bid_count, index)
 
-        """ Heapify um die Struktur wiederherzustellen
-            Wird nach dem Hinzufügen eines neuen Elements verwendet, das an der letzten Position im Heap eingefügt wurde
-            Wird verwendet, um sicherzustellen, dass das neue Element die Heap-Eigenschaft nicht verletzt"""
-        if new_bid_count > old_bid_count:  # HINZUGEFÜGT
+        # größere Anzahl: Auktion wandert nach oben, kleinere Anzahl: Auktion wandert nach unten
+        if new_bid_count > old_bid_count:
             self._heapify_up(index)
         elif new_bid_count < old_bid_count:
             self._heapify_down(index)
-        """ Wird nach dem Entfernen eines Elements oder nach einer Änderung der Anzahl der Bieter für eine Auktion verwendet (wenn sich die Position des Elements im Heap ändert)
-            Wird verwendet, um das Element nach unten zu verschieben, wenn es an einer Position ist, die die Heap-Eigenschaft verletzt"""
 
+    def update(self, auction_id, value):
+        """ Fügt die Auktion mit dem Wert value hinzu oder aktualisiert ihren Wert, wenn sie schon im Heap ist.
+            Laufzeit O(log n).
+
+        Args:
+            auction_id: Die ID-Nummer der Auktion (bzw. des Users).
+            value: Der neue Wert (Anzahl Bieter bzw. mittlere Bewertung).
+        """
+        if auction_id in self.auction_map:
+            self.update_bidders(auction_id, value)
+        else:
+            self.add_auction(auction_id, value)
 
     def remove(self, auction_id):
-        """ Entfernt die Auktion aus dem Max-Heap.
-            Wenn die Auktion nicht im Heap ist, wird keine Auktion entfernt.
+        """ Entfernt die Auktion aus dem Max-Heap. Laufzeit O(log n).
 
         Args:
             auction_id: Die ID-Nummer der Auktion.
+
+        Raises:
+            ValueError: Wenn die Auktion nicht im Heap ist.
         """
         if auction_id not in self.auction_map:
             raise ValueError("Auktion existiert nicht")
 
-        """ Geändert
-        #   Hole die Index und entferne aus dem Heap
-            Zuerst wird Hash-Map (auction_map) abgefragt, um die Position (Index) der Auktion im Heap zu finden
-            pop(auction_id) entfernt das Tuple aus der Hash-Map und gibt es zurück"""
-        bid_count, index = self.auction_map.pop(auction_id)
-        # Dies ersetzt das Element an der Position index im Heap mit dem Element an der letzten Position
-       # self.heap[index] = self.heap[-1]
-        # Nun wird das letzte Element entfernt (das ursprünglich das zu entfernende Element war)
-        #self.heap.pop()
-
-        """ Diese Bedingung stellt sicher, dass die Heapify-Operationen nur ausgeführt werden, wenn der Heap nach der Entfernung noch Elemente enthält
-            Es könnte sein, dass der Heap nach dem Entfernen des letzten Elements leer ist dann müssen keine Heapify-Operationen durchgeführt werden"""
-        if index < len(self.heap):
-          #  self._heapify_up(index)
+        index = self.auction_map.pop(auction_id)
+
+        # das letzte Element ersetzt die zu entfernende Auktion
+        last = self.heap.pop()
+        if index == len(self.heap):
+            # die zu entfernende Auktion war das letzte Element, es muss nichts verschoben werden
+            return
+
+        self.heap[index] = last
+        self.auction_map[last[1]] = index
+
+        # das ehemals letzte Element kann größer als sein neuer Elternknoten oder kleiner als seine neuen Kinder sein
+        if index > 0 and self.heap[index][0] > self.heap[(index - 1) // 2][0]:
+            self._heapify_up(index)
+        else:
             self._heapify_down(index)
 
     # *** PUBLIC GET methods ***
 
     def get_auction_with_max_bidders(self):
-        """ Gibt die Auktion mit der höchsten Anzahl an Bietern zurück.
+        """ Gibt die Auktion mit der höchsten Anzahl an Bietern zurück. Laufzeit O(1).
 
         Returns:
-            Tuple[int, int]: (bid_count, auction_id)
+            Tuple[int, str]: (bid_count, auction_id) oder None, wenn der Heap leer ist
+        """
+        return self.get_max()
+
+    def get_max(self):
+        """ Gibt das Element an der Spitze des Heaps zurück. Laufzeit O(1).
+
+        Returns:
+            Tuple: (value, auction_id) oder None, wenn der Heap leer ist
         """
         if not self.heap:
             return None
-        return self.heap[0][0], self.heap[0][1]
+        return self.heap[0]
+
+    def get_top_k(self, k):
+        """ Gibt die k größten Elemente absteigend sortiert zurück, ohne den Heap zu verändern.
+            Dazu werden die Kandidaten (Kinder bereits ausgegebener Knoten) in einem Hilfs-Heap verwaltet,
+            Laufzeit O(k log k).
+
+        Args:
+            k: Anzahl der Elemente.
+
+        Returns:
+            List[Tuple]: Liste von Tupeln (value, auction_id)
+        """
+        top_k = []
+        candidates = [(-self.heap[0][0], 0)] if self.heap else []
+
+        while candidates and len(top_k) < k:
+            _, index = heapq.heappop(candidates)
+            top_k.append(self.heap[index])
+
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(self.heap):
+                    heapq.heappush(candidates, (-self.heap[child][0], child))
+
+        return top_k
 
     def get_auction_bidders(self, auction_id):
         """ Gibt die Anzahl der Bieter für eine Auktion zurück.
@@ -119,9 +157,37 @@ class MaxHeap:
             Optional[int]: bid_count
         """
         if auction_id in self.auction_map:
-            return self.auction_map[auction_id][0]
+            return self.heap[self.auction_map[auction_id]][0]
         return None
 
+    def validate(self):
+        """ Prüft die Invarianten des Heaps (nur zum Debuggen, Laufzeit O(n)):
+            jeder Knoten ist mindestens so groß wie seine Kinder und auction_map enthält für jede Auktion
+            genau ihre Position im Heap.
+
+        Returns:
+            bool: True, wenn alle Invarianten erfüllt sind.
+
+        Raises:
+            ValueError: Wenn eine Invariante verletzt ist.
+        """
+        if len(self.heap) != len(self.auction_map):
+            raise ValueError("Heap und auction_map enthalten unterschiedlich viele Auktionen")
+
+        for index, (bid_count, auction_id) in enumerate(self.heap):
+            if self.auction_map.get(auction_id) != index:
+                raise ValueError(f"auction_map enthält für Auktion {auction_id} nicht die Position {index}")
+            if index > 0 and self.heap[(index - 1) // 2][0] < bid_count:
+                raise ValueError(f"Heap-Eigenschaft an Position {index} verletzt")
+
+        return True
+
+    def __contains__(self, auction_id):
+        return auction_id in self.auction_map
+
+    def __len__(self):
+        return len(self.heap)
+
     # *** PRIVATE methods ***
 
     def _swap(self, i, j):
@@ -132,11 +198,9 @@ class MaxHeap:
             i: Index der ersten Auktion im Max-Heap.
             j: Index der zweiten Auktion im Max-Heap.
         """
-        """ Geändert 
-            Tauscht zwei Elemente im Heap"""
         self.heap[i], self.heap[j] = self.heap[j], self.heap[i]
-        self.auction_map[self.heap[i][1]] = (self.heap[i][0], i)
-        self.auction_map[self.heap[j][1]] = (self.heap[j][0], j)
+        self.auction_map[self.heap[i][1]] = i
+        self.auction_map[self.heap[j][1]] = j
 
     def _heapify_up(self, index):
         """ Führt das Heapify-Up-Verfahren durch, um die Heap-Eigenschaft nach oben hin wiederherzustellen.
@@ -144,13 +208,11 @@ class MaxHeap:
         Args:
             index: Der Index des Elements, das nach oben "heapified" werden soll.
         """
-        """ Geändert
-            Heapify-Up Verfahrens. """
         while index > 0:                                        # prüft, ob der aktuelle Index des Elements nicht der Wurzelknoten ist
-            parent_index = (index - 1) // 2                     # Berechnung gibt den Index des Elternteils des aktuellen Elements zurück, // ganzzahligen Division-Operator
-            if self.heap[parent_index][0] >= self.heap[index][0]: # Elternteil größer >= dem aktuellen Element, dann ist die Struktur des Heaps in Ordnung und es ist keine weitere Änderung erforderlich
+            parent_index = (index - 1) // 2                     # Index des Elternknotens
+            if self.heap[parent_index][0] >= self.heap[index][0]:  # Elternknoten >= aktuelles Element: Heap ist in Ordnung
                 break
-            self._swap(parent_index, index)                     # aktuelle Element > Elternteil (im Falle eines Max-Heaps), wird das Element mit seinem Elternteil vertauscht, um die Heap-Eigenschaft zu wahren. Das _swap() ist eine Hilfsmethode, die die beiden Elemente im Array vertauscht
+            self._swap(parent_index, index)                     # aktuelles Element > Elternknoten: beide vertauschen
             index = parent_index
 
     def _heapify_down(self, index):
@@ -159,22 +221,17 @@ class MaxHeap:
         Args:
             index: Der Index des Elements, das nach unten "heapified" werden soll.
         """
-        """ Geändert
-            Heapify-Down Verfahren. """
-        n = len(self.heap)          # n = Länge des Heaps, also die Anzahl der Elemente im Heap
-        while 2 * index + 1 < n:    # Schleife wird fortgesetzt, solange das linke Kind (2 * index + 1) des aktuellen Knotens (index) im Heap existiert
-            left = 2 * index + 1    # Hier werden die Indizes des linken und rechten Kindes des aktuellen Knotens (index) berechnet
+        n = len(self.heap)          # n = Anzahl der Elemente im Heap
+        while 2 * index + 1 < n:    # solange das linke Kind des aktuellen Knotens existiert
+            left = 2 * index + 1
             right = 2 * index + 2
-            largest = index         # größte Element (in Bezug auf den Max-Heap) zunächst das aktuelle Element
+            largest = index
 
-            """ Überprüft, ob der Index des linken Kindes innerhalb der Grenzen des Heaps liegt (left < n)
-                Wenn das linke Kind tatsächlich existiert und der Wert dieses Kindes (self.heap[left][0]) > als der Wert des aktuellen Knotens (self.heap[largest][0]), wird der largest-Index auf das linke Kind gesetzt"""
-            if left < n and self.heap[left][0] > self.heap[largest][0]:
+            if self.heap[left][0] > self.heap[largest][0]:
                 largest = left
-            if right < n and self.heap[right][0] > self.heap[largest][0]: # Danach dasselbe für das rechte Kind
+            if right < n and self.heap[right][0] > self.heap[largest][0]:
                 largest = right
-            if largest == index: # Wenn largest == index der Wert des aktuellen Knotens gleich den Werten seiner Kinder, in dem Fall ist der Heap bereits in Ordnung und die Schleife kann abgebrochen werden
+            if largest == index:    # aktueller Knoten ist mindestens so groß wie seine Kinder: Heap ist in Ordnung
                 break
-            self._swap(index, largest) # Wenn das aktuelle Element nicht das größte Element ist, wird das aktuelle Element mit dem größten Kind (largest) getauscht
+            self._swap(index, largest)  # sonst mit dem größeren Kind tauschen und dort weitermachen
             index = largest
-
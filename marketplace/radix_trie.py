@@ -0,0 +1,221 @@
+# Definiert die Klasse RadixTrie, eine komprimierte Variante von marketplace.trie.Trie (Patricia-Trie).
+# Ketten von Knoten mit nur einem Kind werden zu einer Kante zusammengefasst, die mit einer ganzen Zeichenkette
+# (label) beschriftet ist. Die Kinder eines Knotens werden nicht in einem dict, sondern in zwei Arrays gespeichert:
+# einem String mit den Anfangsbuchstaben der Kanten und einer Liste mit den Kindknoten an derselben Position.
+# Die Knoten verwenden __slots__, damit sie kein eigenes __dict__ brauchen.
+
+from marketplace.trie import update_top_words
+
+
+class RadixTrieNode:
+    """A node in the RadixTrie structure.
+
+    Attributes:
+        label: The label of the edge from the parent to this node.
+        child_chars: A string with the first character of the label of every child.
+        children: The child nodes, children[i] belongs to child_chars[i].
+        count: The frequency of the word ending at this node (0 if no word ends here).
+        top_words: The most frequent words in the subtree of this node as tuples (-count, word), sorted by
+            decreasing frequency and then alphabetically.
+    """
+
+    __slots__ = ("label", "child_chars", "children", "count", "top_words")
+
+    # *** CONSTRUCTORS ***
+    def __init__(self, label=""):
+        self.label = label
+        self.child_chars = ""
+        self.children = []
+        self.count = 0
+        self.top_words = []
+
+    # *** PUBLIC methods ***
+
+    def add_child(self, child):
+        self.child_chars += child.label[0]
+        self.children.append(child)
+
+    # *** PUBLIC GET methods ***
+
+    def get_child(self, char):
+        """
+        Returns:
+            The child whose label starts with char, None if there is no such child.
+        """
+        index = self.child_chars.find(char)
+        if index < 0:
+            return None
+        return self.children[index]
+
+    def is_end_of_word(self):
+        return self.count > 0
+
+
+class RadixTrie:
+    """A compressed Trie for storing strings with the same API as marketplace.trie.Trie.
+
+    Attributes:
+        _root (RadixTrieNode): The root node of the RadixTrie, its label is empty.
+        _max_top_words (int): The number of completions that are cached in every node.
+    """
+
+    # Anzahl der Vervollständigungen, die standardmäßig in jedem Knoten gespeichert werden
+    MAX_TOP_WORDS = 10
+
+    # *** CONSTRUCTORS ***
+    def __init__(self, max_top_words=MAX_TOP_WORDS):
+        self._root = RadixTrieNode()
+        self._max_top_words = max_top_words
+
+    # *** PUBLIC methods ***
+
+    def insert(self, word, count=1):
+        """Inserts a word into the RadixTrie or increases its frequency by count, if it is already in the RadixTrie.
+        Follows the edges whose labels are a prefix of the rest of the word. If an edge label and the rest of the
+        word only share a part, the edge is split into two edges at the end of the common part.
+        Afterwards the cached completions of all nodes on the path are updated.
+
+        Args:
+            word (str): The word to be inserted into the RadixTrie.
+            count (int): The number of occurrences of the word that are added, e.g. from a Counter.
+        """
+        word = word.lower()
+        node = self._root
+        path = [node]
+        i = 0
+        while i < len(word):
+            index = node.child_chars.find(word[i])
+            if index < 0:
+                # no edge starts with the next character: the rest of the word becomes a new leaf
+                leaf = RadixTrieNode(word[i:])
+                node.add_child(leaf)
+                node = leaf
+                path.append(node)
+                break
+
+            child = node.children[index]
+            label = child.label
+            common = RadixTrie._common_prefix_length(label, word, i)
+
+            if common < len(label):
+                # split the edge: the new middle node has the same subtree (and completions) as the child before
+                middle = RadixTrieNode(label[:common])
+                middle.top_words = list(child.top_words)
+                child.label = label[common:]
+                middle.add_child(child)
+                node.children[index] = middle
+                child = middle
+
+            node = child
+            path.append(node)
+            i += common
+
+        node.count += count
+
+        # the word is part of the subtree of each node on the path
+        for path_node in path:
+            update_top_words(path_node.top_words, word, node.count, self._max_top_words)
+
+    # *** PUBLIC GET methods ***
+
+    def search(self, prefix, k=None):
+        """Searches for the words in the RadixTrie that start with the given prefix, most frequent words first.
+        If at most max_top_words words are requested, they are taken from the cache of the node in which the prefix
+        ends in O(len(prefix) + k). Otherwise all words in the subtree of this node are collected.
+
+        Args:
+            prefix (str): The prefix to search for in the RadixTrie.
+            k (int): The maximum number of words to return. If None, all words with the prefix are returned.
+
+        Returns:
+            list: A list of words that start with the given prefix.
+        """
+        prefix = prefix.lower()
+        node, word = self._find_node(prefix)
+        if node is None:
+            return []
+
+        if k is not None and k <= self._max_top_words:
+            return [top_word for _, top_word in node.top_words[:k]]
+
+        words = sorted(RadixTrie._find_words(node, word))
+        return [found_word for _, found_word in words[:k]]
+
+    def count(self, word):
+        """
+        Returns:
+            int: The frequency of the given word, 0 if it is not in the RadixTrie.
+        """
+        word = word.lower()
+        node, node_word = self._find_node(word)
+        if node is None or node_word != word:
+            return 0
+        return node.count
+
+    def num_nodes(self):
+        """
+        Returns:
+            int: The number of nodes in the RadixTrie, including the root.
+        """
+        num_nodes = 0
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            num_nodes += 1
+            stack.extend(node.children)
+        return num_nodes
+
+    # *** PRIVATE methods ***
+
+    def _find_node(self, prefix):
+        """Finds the node in which the given prefix ends. The prefix may end in the middle of the label of the edge
+        to this node.
+
+        Returns:
+            tuple: (node, word) with the word formed from the root to node, or (None, None) if no word in the
+            RadixTrie starts with prefix.
+        """
+        node = self._root
+        word = ""
+        while len(word) < len(prefix):
+            node = node.get_child(prefix[len(word)])
+            if node is None:
+                return None, None
+            # the label must continue the prefix or the prefix must end inside the label
+            if not prefix.startswith(node.label, len(word)) and not node.label.startswith(prefix[len(word):]):
+                return None, None
+            word += node.label
+        return node, word
+
+    @staticmethod
+    def _common_prefix_length(label, word, start):
+        """
+        Returns:
+            int: The length of the common prefix of label and word[start:].
+        """
+        length = 0
+        max_length = min(len(label), len(word) - start)
+        while length < max_length and label[length] == word[start + length]:
+            length += 1
+        return length
+
+    @staticmethod
+    def _find_words(node, word):
+        """Finds all words starting from the given node without recursion.
+
+        Args:
+            node (RadixTrieNode): The node to start the search from.
+            word (str): The word formed from the root to this node.
+
+        Returns:
+            list: A list of tuples (-count, word) found from this node.
+        """
+        words = []
+        stack = [(node, word)]
+        while stack:
+            node, word = stack.pop()
+            if node.is_end_of_word():
+                words.append((-node.count, word))
+            for child in node.children:
+                stack.append((child, word + child.label))
+        return words
@@ -0,0 +1,239 @@
+# Definiert die Klasse RoadGraph.
+# Ein RoadGraph ist ein gerichtetes Straßennetz im CSR-Format (compressed sparse row): die Kanten, die vom Knoten u
+# ausgehen, stehen in indices[indptr[u]:indptr[u + 1]] (Zielknoten) und lengths[indptr[u]:indptr[u + 1]] (Länge in
+# Metern). Jeder Knoten hat außerdem Koordinaten (lat, lon) und seine OSM-ID (node_ids).
+# Die Arrays werden als .npy-Dateien in einem Verzeichnis gespeichert und mit mmap_mode='r' geladen. Das Laden dauert
+# deshalb auch für ganz NRW nur Millisekunden und braucht kein Internet; das Betriebssystem liest nur die Teile der
+# Dateien, die wirklich gebraucht werden.
+#
+# Das Verzeichnis wird einmalig aus OSM-Daten erzeugt (dafür wird osmnx gebraucht), entweder aus einer .osm-Datei
+# oder durch einen Download für einen Ortsnamen. Aufruf aus dem Hauptverzeichnis des Projekts:
+#     python -m marketplace.road_graph "North Rhine-Westphalia, Germany" road_graph_nrw
+#     python -m marketplace.road_graph nrw.osm road_graph_nrw
+
+import heapq
+import math
+import os
+import sys
+
+import numpy as np
+
+
+class RoadGraph:
+    """
+    Directed road network stored as CSR arrays
+
+    Attributes:
+        node_ids (numpy.ndarray): OSM id of every node (int64)
+        lat (numpy.ndarray): latitude of every node (float64)
+        lon (numpy.ndarray): longitude of every node (float64)
+        indptr (numpy.ndarray): edges of node u are at the positions indptr[u] to indptr[u + 1] - 1 (int64, n + 1)
+        indices (numpy.ndarray): target node of every edge (int32)
+        lengths (numpy.ndarray): length of every edge in meters (float32)
+    """
+
+    # Namen der Arrays, jedes Array wird als <Name>.npy gespeichert
+    ARRAYS = ("node_ids", "lat", "lon", "indptr", "indices", "lengths")
+
+    # *** CONSTRUCTORS ***
+    def __init__(self, node_ids, lat, lon, indptr, indices, lengths):
+        self.node_ids = node_ids
+        self.lat = lat
+        self.lon = lon
+        self.indptr = indptr
+        self.indices = indices
+        self.lengths = lengths
+
+    @classmethod
+    def load(cls, directory, mmap_mode='r'):
+        """
+        Loads a RoadGraph that was saved with save(). The arrays are memory-mapped, not read.
+
+        :param directory: directory with the .npy files
+        :param mmap_mode: mmap_mode of numpy.load(), None to read the arrays into memory
+        :return: RoadGraph
+        """
+        arrays = [np.load(os.path.join(directory, name + ".npy"), mmap_mode=mmap_mode) for name in cls.ARRAYS]
+        return cls(*arrays)
+
+    @classmethod
+    def from_networkx(cls, graph):
+        """
+        Converts a road network of osmnx (networkx.MultiDiGraph with node attributes x, y and edge attribute length)
+        into a RoadGraph. Of several parallel edges between two nodes only the shortest is kept.
+
+        :param graph: networkx.MultiDiGraph
+        :return: RoadGraph
+        """
+        node_ids = np.fromiter(graph.nodes, dtype=np.int64, count=graph.number_of_nodes())
+        index_of_node = {node_id: index for index, node_id in enumerate(node_ids.tolist())}
+        lat = np.array([graph.nodes[node_id]['y'] for node_id in node_ids.tolist()], dtype=np.float64)
+        lon = np.array([graph.nodes[node_id]['x'] for node_id in node_ids.tolist()], dtype=np.float64)
+
+        # kürzeste Kante für jedes Paar (u, v)
+        edges = {}
+        for u, v, length in graph.edges(data='length'):
+            key = (index_of_node[u], index_of_node[v])
+            if length is not None and (key not in edges or length < edges[key]):
+                edges[key] = length
+
+        return cls.from_edges(node_ids, lat, lon, edges)
+
+    @classmethod
+    def from_edges(cls, node_ids, lat, lon, edges):
+        """
+        Builds the CSR arrays from a dictionary of edges.
+
+        :param node_ids: OSM id of every node
+        :param lat: latitude of every node
+        :param lon: longitude of every node
+        :param edges: dictionary (u, v) -> length in meters, with u and v being node indices
+        :return: RoadGraph
+        """
+        num_nodes = len(node_ids)
+        sorted_edges = sorted(edges.items())
+        sources = np.array([u for (u, _), _ in sorted_edges], dtype=np.int64)
+
+        indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=num_nodes), out=indptr[1:])
+        indices = np.array([v for (_, v), _ in sorted_edges], dtype=np.int32)
+        lengths = np.array([length for _, length in sorted_edges], dtype=np.float32)
+
+        return cls(np.asarray(node_ids, dtype=np.int64), np.asarray(lat, dtype=np.float64),
+                   np.asarray(lon, dtype=np.float64), indptr, indices, lengths)
+
+    # *** PUBLIC methods ***
+
+    def save(self, directory):
+        """
+        Saves all arrays as .npy files in the given directory, which is created if necessary.
+        """
+        os.makedirs(directory, exist_ok=True)
+        for name in self.ARRAYS:
+            np.save(os.path.join(directory, name + ".npy"), np.ascontiguousarray(getattr(self, name)))
+
+    # *** PUBLIC GET methods ***
+
+    def num_nodes(self):
+        return len(self.node_ids)
+
+    def num_edges(self):
+        return len(self.indices)
+
+    def signature(self):
+        """
+        Identifies the road network that node indices belong to, e.g. for data derived from it that is saved on disk.
+
+        :return: tuple (number of nodes, number of edges)
+        """
+        return self.num_nodes(), self.num_edges()
+
+    def neighbors(self, node):
+        """
+
+        :param node: index of a node
+        :return: tuple (targets, lengths) of the edges leaving node
+        """
+        start, end = self.indptr[node], self.indptr[node + 1]
+        return self.indices[start:end], self.lengths[start:end]
+
+    def nearest_node(self, lat, lon):
+        """
+        Returns the node that is closest to the given coordinates. The distance is approximated by projecting the
+        coordinates onto a plane at latitude lat, which is exact enough for the size of a German state.
+
+        :return: index of the nearest node
+        """
+        dx = (self.lon - lon) * math.cos(math.radians(lat))
+        dy = self.lat - lat
+        return int(np.argmin(dx * dx + dy * dy))
+
+    def shortest_path_length(self, source, target):
+        """
+        Computes the length of the shortest path from source to target with Dijkstra's algorithm. The search stops as
+        soon as target is settled.
+
+        :param source: index of the start node
+        :param target: index of the destination node
+        :return: length in meters, float('inf') if target cannot be reached
+        """
+        return self.distances_from(source, [target])[target]
+
+    def distances_from(self, source, targets, cutoff=math.inf):
+        """
+        Computes the lengths of the shortest paths from source to all targets with a single run of Dijkstra's
+        algorithm. The search stops as soon as all targets are settled or the next node is farther away than cutoff,
+        so the search space is bounded by the farthest target or the cutoff.
+
+        :param source: index of the start node
+        :param targets: indices of the destination nodes
+        :param cutoff: maximum length in meters, targets that are farther away get float('inf')
+        :return: dictionary target -> length in meters, float('inf') if the target cannot be reached within cutoff
+        """
+        lengths = {int(target): math.inf for target in targets}
+        num_open_targets = len(lengths)
+        if num_open_targets == 0:
+            return lengths
+
+        distances = {source: 0.0}
+        heap = [(0.0, source)]
+        settled = set()
+
+        while heap:
+            distance, node = heapq.heappop(heap)
+            if distance > cutoff:
+                break
+            if node in settled:
+                continue
+            settled.add(node)
+
+            if node in lengths:
+                lengths[node] = distance
+                num_open_targets -= 1
+                if num_open_targets == 0:
+                    break
+
+            start, end = int(self.indptr[node]), int(self.indptr[node + 1])
+            for neighbor, length in zip(self.indices[start:end].tolist(), self.lengths[start:end].tolist()):
+                new_distance = distance + length
+                if new_distance <= cutoff and new_distance < distances.get(neighbor, math.inf):
+                    distances[neighbor] = new_distance
+                    heapq.heappush(heap, (new_distance, neighbor))
+
+        return lengths
+
+    # *** PUBLIC STATIC methods ***
+
+    @staticmethod
+    def exists(directory):
+        return all(os.path.isfile(os.path.join(directory, name + ".npy")) for name in RoadGraph.ARRAYS)
+
+    @staticmethod
+    def build(source, network_type='drive'):
+        """
+        Builds a RoadGraph from OSM data with osmnx. osmnx is only imported here, so that loading a saved RoadGraph
+        does not need it.
+
+        :param source: path of an .osm (XML) extract or the name of a place that is downloaded, e.g.
+        'North Rhine-Westphalia, Germany'
+        :param network_type: network type of osmnx for a download
+        :return: RoadGraph
+        """
+        import osmnx as ox
+
+        if os.path.isfile(source):
+            graph = ox.graph_from_xml(source)
+        else:
+            graph = ox.graph.graph_from_place(source, network_type=network_type)
+
+        return RoadGraph.from_networkx(graph)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Aufruf: python -m marketplace.road_graph <OSM-Datei oder Ortsname> <Zielverzeichnis>")
+        sys.exit(1)
+
+    road_graph = RoadGraph.build(sys.argv[1])
+    road_graph.save(sys.argv[2])
+    print(f"{road_graph.num_nodes()} Knoten und {road_graph.num_edges()} Kanten in {sys.argv[2]} gespeichert")
@@ -1,7 +1,6 @@
 import threading
 import random
 import time
-import marketplace.users
 
 
 class Simulator:
@@ -31,16 +30,16 @@ class Simulator:
             value_min = 1
             auctions.add_new_auction(random_user, item_name, description, value_min)
 
-    def randomly_rate_users(self, users: marketplace.users.Users, current_user_id):
+    def randomly_rate_users(self, auctions, current_user_id):
         if self.stop_simulation:
             return
 
-        user_ids = [user_id for user_id in users.keys() if user_id != current_user_id]
+        user_ids = [user_id for user_id in auctions.users().keys() if user_id != current_user_id]
 
         for _ in range(35):
             random_user = random.choice(user_ids)
             stars = random.randint(1,5)
-            users[random_user].rate_user(stars)
+            auctions.add_user_rating(random_user, stars)
 
     def stop(self):
         self.stop_simulation = True
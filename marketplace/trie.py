@@ -1,4 +1,38 @@
 # Definiert die Klasse Trie. class is used to look for all words that start with a given prefix.
+# Jeder Knoten speichert zusätzlich die k häufigsten Wörter seines Teilbaums, damit die Autovervollständigung nicht
+# den ganzen Teilbaum durchlaufen muss.
+
+def update_top_words(top_words, word, count, max_words):
+    """Updates a list of cached completions (-count, word), sorted by decreasing frequency and then alphabetically,
+    after the frequency of word was increased to count. Since frequencies only grow, the new top words are the old
+    ones plus word. Runtime O(max_words).
+
+    Args:
+        top_words (list): The cached completions, changed in place.
+        word (str): The word whose frequency was increased.
+        count (int): The new frequency of word.
+        max_words (int): The maximum number of cached completions.
+    """
+    entry = (-count, word)
+
+    # word is less frequent than the last cached word and the cache is full: nothing changes
+    if len(top_words) >= max_words and entry >= top_words[-1]:
+        return
+
+    # remove the old entry of word, its frequency has changed
+    for i, (_, top_word) in enumerate(top_words):
+        if top_word == word:
+            del top_words[i]
+            break
+
+    # insert the new entry at its sorted position
+    i = len(top_words)
+    while i > 0 and entry < top_words[i - 1]:
+        i -= 1
+    top_words.insert(i, entry)
+
+    del top_words[max_words:]
+
 
 class TrieNode:
     """A node in the Trie structure.
@@ -6,6 +40,9 @@ class TrieNode:
    Attributes:
        children: A dictionary mapping character to TrieNode.
        _is_end_of_word: A boolean indicating if the node represents the end of a word.
+       _count: The frequency of the word ending at this node (0 if no word ends here).
+       _top_words: The most frequent words in the subtree of this node as tuples (-count, word), sorted by
+           decreasing frequency and then alphabetically.
    """
 
     # *** CONSTRUCTORS ***
@@ -13,6 +50,8 @@ class TrieNode:
         """Initializes a TrieNode with an empty children dictionary and end-of-word flag set to False."""
         self.children = {}
         self._is_end_of_word = False
+        self._count = 0
+        self._top_words = []
 
     # *** PUBLIC SET methods ***
 
@@ -22,50 +61,100 @@ class TrieNode:
         """
         self._is_end_of_word = True
 
+    def increase_count(self, count):
+        """
+        Increases the frequency of the word ending at this node by count
+
+        Returns:
+            int: The new frequency.
+        """
+        self._count += count
+        return self._count
+
+    def update_top_words(self, word, count, max_words):
+        """Updates the cached completions after the frequency of word in the subtree of this node was increased to
+        count. Runtime O(max_words).
+
+        Args:
+            word (str): The word whose frequency was increased.
+            count (int): The new frequency of word.
+            max_words (int): The maximum number of cached completions.
+        """
+        update_top_words(self._top_words, word, count, max_words)
+
     # *** PUBLIC methods to return class properties ***
 
     def is_end_of_word(self):
         return self._is_end_of_word
 
+    def count(self):
+        return self._count
+
+    def top_words(self, k, with_count=False):
+        if with_count:
+            return [(word, -neg_count) for neg_count, word in self._top_words[:k]]
+        return [word for _, word in self._top_words[:k]]
+
 
 class Trie:
     """A Trie data structure for storing strings.
 
     Attributes:
         _root (TrieNode): The root node of the Trie.
+        _max_top_words (int): The number of completions that are cached in every node.
     """
 
+    # Anzahl der Vervollständigungen, die standardmäßig in jedem Knoten gespeichert werden
+    MAX_TOP_WORDS = 10
+
     # *** CONSTRUCTORS ***
-    def __init__(self):
-        """Initializes a Trie with a root TrieNode."""
+    def __init__(self, max_top_words=MAX_TOP_WORDS):
+        """Initializes a Trie with a root TrieNode.
+
+        Args:
+            max_top_words (int): The number of completions that are cached in every node.
+        """
         self._root = TrieNode()
+        self._max_top_words = max_top_words
 
     # *** PUBLIC methods ***
 
-    def insert(self, word):
+    def insert(self, word, count=1):
         """Inserts a word into the Trie. Goes through each character of the given word. if a character is not yet
         a child node, then add a new TrieNode for this character and go to this child node. the node representing the
         last character of the word is marked by setting _is_end_of_word to True.
+        If the word is already in the Trie, its frequency is increased by count. Afterwards the cached completions of
+        all nodes on the path are updated. Runtime O(len(word) * max_top_words).
 
         Args:
             word (str): The word to be inserted into the Trie.
+            count (int): The number of occurrences of the word that are added, e.g. from a Counter.
         """
         word = word.lower()
         node = self._root
+        path = [node]
         for char in word:           # for each character of the word
             if char not in node.children:
                 node.children[char] = TrieNode()
             node = node.children[char]
+            path.append(node)
         node.set_is_end_of_word()
+        new_count = node.increase_count(count)
+
+        # the word is part of the subtree of each node on the path
+        for path_node in path:
+            path_node.update_top_words(word, new_count, self._max_top_words)
 
     # *** PUBLIC GET methods ***
 
-    def search(self, prefix):
-        """Searches for all words in the Trie that start with the given prefix. Calls _ind_words with the node that is
-        the last node of the prefix
+    def search(self, prefix, k=None):
+        """Searches for the words in the Trie that start with the given prefix, most frequent words first.
+        If at most max_top_words words are requested, they are taken from the cache of the last node of the prefix
+        in O(len(prefix) + k). Otherwise _find_words is called with this node.
 
         Args:
             prefix (str): The prefix to search for in the Trie.
+            k (int): The maximum number of words to return. If None, all words with the prefix are returned.
 
         Returns:
             list: A list of words that start with the given prefix.
@@ -76,7 +165,74 @@ class Trie:
             if char not in node.children:
                 return []
             node = node.children[char]
-        return Trie._find_words(node, prefix)
+
+        if k is not None and k <= self._max_top_words:
+            return node.top_words(k)
+
+        words = sorted(Trie._find_words(node, prefix))
+        return [word for _, word in words[:k]]
+
+    def fuzzy_search(self, prefix, max_distance=1, k=None):
+        """Searches for the words in the Trie that start with a string whose Levenshtein distance to the given prefix
+        is at most max_distance, e.g. to find "kaffeemaschine" for the typo "kafe".
+        The Trie is traversed depth-first. For each node the row of the edit distance table between the prefix and
+        the string formed from the root to this node is computed from the row of the parent in O(len(prefix)).
+        Once the smallest value in the row is larger than max_distance, no string below this node can get closer to
+        the prefix and the whole subtree is skipped. The completions of a node whose string is close enough are
+        taken from its cache.
+
+        Args:
+            prefix (str): The (possibly misspelled) prefix to search for in the Trie.
+            max_distance (int): The maximum number of inserted, deleted or replaced characters.
+            k (int): The maximum number of words to return. If None, all matching words are returned.
+
+        Returns:
+            list: A list of words, sorted by edit distance and then by decreasing frequency.
+        """
+        prefix = prefix.lower()
+
+        # best (distance, -count) of every word found so far
+        found_words = {}
+
+        stack = [(self._root, "", list(range(len(prefix) + 1)))]
+        while stack:
+            node, word, row = stack.pop()
+
+            if row[-1] <= max_distance:
+                if k is not None and k <= self._max_top_words:
+                    completions = node.top_words(k, with_count=True)
+                else:
+                    completions = [(found_word, -neg_count) for neg_count, found_word in Trie._find_words(node, word)]
+                for completion, count in completions:
+                    entry = (row[-1], -count)
+                    if completion not in found_words or entry < found_words[completion]:
+                        found_words[completion] = entry
+
+            if min(row) > max_distance:
+                continue
+
+            for char, next_node in node.children.items():
+                # next row of the edit distance table: delete, insert or replace (free if the characters match)
+                next_row = [row[0] + 1]
+                for j in range(1, len(prefix) + 1):
+                    next_row.append(min(next_row[j - 1] + 1, row[j] + 1,
+                                        row[j - 1] + (prefix[j - 1] != char)))
+                stack.append((next_node, word + char, next_row))
+
+        ranked_words = sorted(found_words.items(), key=lambda word_entry: (word_entry[1], word_entry[0]))
+        return [found_word for found_word, _ in ranked_words[:k]]
+
+    def count(self, word):
+        """
+        Returns:
+            int: The frequency of the given word, 0 if it is not in the Trie.
+        """
+        node = self._root
+        for char in word.lower():
+            if char not in node.children:
+                return 0
+            node = node.children[char]
+        return node.count()
 
     # *** PRIVATE methods ***
 
@@ -89,11 +245,11 @@ class Trie:
             prefix (str): The current prefix formed from the root to this node.
 
         Returns:
-            list: A list of words found from this node.
+            list: A list of tuples (-count, word) found from this node.
         """
         words = []
         if node.is_end_of_word():
-            words.append(prefix)
+            words.append((-node.count(), prefix))
         for char, next_node in node.children.items():
             words.extend(Trie._find_words(next_node, prefix + char))
         return words
@@ -15,6 +15,7 @@
 # damit ist User ein Mitglied einer Praktikumsgruppe
 
 import marketplace.praktikumsgruppen
+import time
 
 
 class User(marketplace.praktikumsgruppen.SetNode):
@@ -30,9 +31,17 @@ class User(marketplace.praktikumsgruppen.SetNode):
         _balance (float): budget of user in €
         _gps_coords ():
         _address (str): location, street where user lives according to gps coordinate
-        _rating_stars (list): list with stars the user got from other users
+        _rating_stars_sum (int): sum of all stars the user got from other users
+        _rating_stars_count (int): number of ratings the user got from other users
+        _rating_stars_histogram (list): number of ratings with 1, 2, 3, 4 and 5 stars (index 0 to 4)
+        _rating_stars_decayed_sum (float): sum of all stars, each weighted by 0.5 ** (age / RATING_HALF_LIFE)
+        _rating_stars_decayed_weight (float): sum of the weights of all ratings
+        _rating_time_last (float): time in seconds (time.time()) of the last rating
     """
 
+    # Halbwertszeit in Sekunden, nach der eine Bewertung im zeitlich gewichteten Mittelwert nur noch halb zählt
+    RATING_HALF_LIFE = 3600.0
+
     # *** CONSTRUCTORS ***
     def __init__(self, user_id: str, password: str, name_family: str, name_first: str, gps_coord, address):
         """
@@ -62,7 +71,16 @@ class User(marketplace.praktikumsgruppen.SetNode):
         # Adresse, die zur GPS-Koordinate gehört
         self._address = address
 
-        self._rating_stars = []
+        # statt aller Bewertungen werden nur Summe, Anzahl und Histogramm gespeichert, damit Mittelwert und Median in
+        # O(1) berechnet werden und der Speicherbedarf nicht mit der Anzahl der Bewertungen wächst
+        self._rating_stars_sum = 0
+        self._rating_stars_count = 0
+        self._rating_stars_histogram = [0] * 5
+
+        # zeitlich gewichteter Mittelwert: ältere Bewertungen zählen weniger
+        self._rating_stars_decayed_sum = 0.0
+        self._rating_stars_decayed_weight = 0.0
+        self._rating_time_last = None
 
     # *** PUBLIC SET methods ***
 
@@ -99,15 +117,31 @@ class User(marketplace.praktikumsgruppen.SetNode):
     def friends_delete(self, friend_id):
         self._friends.remove(friend_id)
 
-    def rate_user(self, stars: int):
+    def rate_user(self, stars: int, timestamp=None):
         """
         Adds a rating to the user.
 
         Args:
             stars (int): The number of stars (1 to 5).
+            timestamp (float): Time of the rating in seconds (time.time()), defaults to now.
         """
         if 1 <= stars <= 5:
-            self._rating_stars.append(stars)
+            self._rating_stars_sum += stars
+            self._rating_stars_count += 1
+            self._rating_stars_histogram[stars - 1] += 1
+
+            if timestamp is None:
+                timestamp = time.time()
+
+            # bisherige Bewertungen altern um die Zeit seit der letzten Bewertung
+            if self._rating_time_last is not None:
+                decay = 0.5 ** (max(timestamp - self._rating_time_last, 0.0) / self.RATING_HALF_LIFE)
+                self._rating_stars_decayed_sum *= decay
+                self._rating_stars_decayed_weight *= decay
+
+            self._rating_stars_decayed_sum += stars
+            self._rating_stars_decayed_weight += 1.0
+            self._rating_time_last = timestamp
         else:
             raise ValueError("Rating must be between 1 and 5.")
 
@@ -126,19 +160,63 @@ class User(marketplace.praktikumsgruppen.SetNode):
         return user_id in self._friends
 
     def get_rating_stars_mean(self):
-        mean = 0
-        for star in self._rating_stars:
-            mean = mean + star
+        if self._rating_stars_count == 0:
+            return 0
+
+        return self._rating_stars_sum / self._rating_stars_count
+
+    def get_rating_stars_mean_decayed(self):
+        """
+
+        :return: mean of all stars, where a rating counts half as much every RATING_HALF_LIFE seconds it is older than
+        the last rating. 0, if user has not been rated yet
+        """
+        if self._rating_stars_decayed_weight == 0:
+            return 0
+
+        return self._rating_stars_decayed_sum / self._rating_stars_decayed_weight
+
+    def get_rating_stars_median(self):
+        """
+
+        :return: median of all stars, computed from the histogram. 0, if user has not been rated yet
+        """
+        if self._rating_stars_count == 0:
+            return 0
 
-        if len(self._rating_stars) >= 1:
-            mean /= len(self._rating_stars)
+        # bei gerader Anzahl ist der Median der Mittelwert der beiden mittleren Bewertungen
+        lower = self._get_rating_stars_kth((self._rating_stars_count - 1) // 2)
+        upper = self._get_rating_stars_kth(self._rating_stars_count // 2)
 
-        return mean
+        return (lower + upper) / 2
+
+    def get_rating_stars_histogram(self):
+        """
+
+        :return: dictionary with the number of ratings for every number of stars (key = stars, value = count)
+        """
+        return {stars: count for stars, count in enumerate(self._rating_stars_histogram, start=1)}
+
+    def get_rating_stars_count(self):
+        return self._rating_stars_count
 
     # *** PUBLIC STATIC methods ***
 
     # *** PRIVATE methods ***
 
+    def _get_rating_stars_kth(self, k):
+        """
+
+        :param k: index (starting at 0) of a rating if all ratings were sorted ascending
+        :return: number of stars of the k-th rating
+        """
+        for stars, count in enumerate(self._rating_stars_histogram, start=1):
+            if k < count:
+                return stars
+            k -= count
+
+        raise ValueError("k must be smaller than the number of ratings.")
+
     # *** PUBLIC methods to return class properties ***
 
     def balance(self):
@@ -164,5 +242,5 @@ class User(marketplace.praktikumsgruppen.SetNode):
 
     def get_coordinates(self):
         """Gibt die Koordinaten des Nutzers zurück"""
-        return (self._latitude, self._longitude)
+        return self._gps_coords
     # *** PRIVATE variables ***